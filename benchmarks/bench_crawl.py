@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+End-to-end crawl benchmark: HomeworkCrawler.get_all_homework() against
+the local mock server (benchmarks/mock_server.py).
+
+Each run is appended as one JSON line to output/bench_results.jsonl
+(commit, settings, best time, requests), so results can be compared
+across changes.
+
+Usage:
+    python benchmarks/bench_crawl.py [--courses 12] [--rows 30] [--latency 0.02]
+                                     [--workers 1 4 8] [--repeat 3] [--error-rate 0]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_server import MockWlxtServer  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, 'output', 'bench_results.jsonl')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def crawl_once(workers: int, error_rate: float):
+    """Run one full crawl on a fresh session; return (seconds, homework, failures)."""
+    import requests
+    from src.crawler import HomeworkCrawler
+    from src.policy import CircuitBreaker, RequestPolicy
+    from src.transport import configure_transport
+    
+    session = configure_transport(requests.Session())
+    # With injected errors, keep the breaker from pausing the whole run
+    policy = RequestPolicy(breaker=CircuitBreaker(reset_timeout=0.5)) if error_rate else None
+    crawler = HomeworkCrawler(session, max_workers=workers, policy=policy)
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        homework = crawler.get_all_homework()
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed, len(homework), len(crawler.failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--courses', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=30, help='homework per course and list')
+    parser.add_argument('--latency', type=float, default=0.02, help='server delay per request (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 answers')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per setting (best is kept)')
+    parser.add_argument('--results', default=RESULTS_FILE, help='JSONL file to append to')
+    args = parser.parse_args()
+    
+    server = MockWlxtServer(
+        courses=args.courses,
+        rows=args.rows,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    # The API URLs are built from WLXT_BASE_URL when src.config is imported
+    os.environ['WLXT_BASE_URL'] = server.start()
+    from src.config import HOMEWORK_PAGE_SIZE
+    
+    print(f"{args.courses} courses × 3 lists × {args.rows} rows, "
+          f"{args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors, "
+          f"page size {HOMEWORK_PAGE_SIZE}\n")
+    
+    commit = git_commit()
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    
+    try:
+        for workers in args.workers:
+            times = []
+            for _ in range(args.repeat):
+                server.reset_counts()
+                seconds, count, failures = crawl_once(workers, args.error_rate)
+                times.append(seconds)
+            
+            best = min(times)
+            requests_sent = sum(server.counts.values())
+            print(f"   {workers:2d} workers  best {best:6.3f}s  "
+                  f"median {sorted(times)[len(times) // 2]:6.3f}s  "
+                  f"{count:5d} homework  {requests_sent:4d} requests  "
+                  f"{count / best:8.0f} homework/s"
+                  + (f"  {failures} failed lists" if failures else ""))
+            
+            result = {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': commit,
+                'python': platform.python_version(),
+                'courses': args.courses,
+                'rows': args.rows,
+                'latency': args.latency,
+                'error_rate': args.error_rate,
+                'page_size': HOMEWORK_PAGE_SIZE,
+                'workers': workers,
+                'runs': times,
+                'best': best,
+                'homework': count,
+                'requests': requests_sent,
+                'server_errors': server.errors,
+                'failed_lists': failures,
+            }
+            with open(args.results, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result) + '\n')
+    finally:
+        server.stop()
+    
+    print(f"\nResults appended to {os.path.relpath(args.results)}")
+
+
+if __name__ == '__main__':
+    main()
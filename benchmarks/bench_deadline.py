@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: shared deadline parser vs. the old strptime loop.
+
+Usage:
+    python benchmarks/bench_deadline.py
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.deadline import parse_deadline, _parse_text  # noqa: E402
+
+
+def legacy_parse(deadline_str):
+    """The previous approach: try each strptime format in turn."""
+    if not deadline_str:
+        return None
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(deadline_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def make_inputs(count: int, distinct: int) -> list:
+    """Deadline strings in the three known shapes, with realistic repetition."""
+    rng = random.Random(42)
+    base = datetime(2024, 9, 1)
+    pool = []
+    for i in range(distinct):
+        dt = base + timedelta(minutes=rng.randrange(0, 200 * 24 * 60))
+        fmt = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")[i % 3]
+        pool.append(dt.strftime(fmt))
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def bench(name: str, func, inputs: list, repeat: int = 5, before=None) -> float:
+    def run():
+        if before:
+            before()
+        for value in inputs:
+            func(value)
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    per_item = best / len(inputs) * 1e6
+    print(f"   {name:<28} {best * 1000:8.2f} ms  ({per_item:.2f} µs/item)")
+    return best
+
+
+def main():
+    inputs = make_inputs(count=50_000, distinct=500)
+    print(f"Parsing {len(inputs)} deadlines ({len(set(inputs))} distinct)\n")
+    
+    # Sanity check: same results as before
+    for value in set(inputs):
+        assert parse_deadline(value) == legacy_parse(value), value
+    
+    legacy = bench("legacy strptime loop", legacy_parse, inputs)
+    cold = bench("fast path, cold cache", parse_deadline, inputs, before=_parse_text.cache_clear)
+    fast_only = bench("fast path, no memo", _parse_text.__wrapped__, inputs)
+    warm = bench("fast path, warm cache", parse_deadline, inputs)
+    
+    print()
+    print(f"   speedup (no memo):   {legacy / fast_only:5.1f}x")
+    print(f"   speedup (cold memo): {legacy / cold:5.1f}x")
+    print(f"   speedup (warm memo): {legacy / warm:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark: how long `import main` takes now that Selenium
+and BeautifulSoup are loaded lazily, vs. also loading the browser stack
+(what every run used to pay).
+
+Each statement runs in a fresh interpreter, so nothing is cached in
+sys.modules between measurements.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 10] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("import main (lazy)", "import main"),
+    ("import main + browser stack", "import main, src.browser, src.waits, src.parsing"),
+    ("selenium.webdriver alone", "import selenium.webdriver"),
+    ("bs4 alone", "import bs4"),
+]
+
+_TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+import sys
+heavy = [m for m in ('selenium', 'bs4', 'lxml') if m in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def measure(statement: str, runs: int):
+    """Return (seconds per run, heavy modules loaded) for ``statement``."""
+    times = []
+    heavy = ''
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _TIMER.format(statement=statement)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+        heavy = output[1] if len(output) > 1 else ''
+    return times, heavy
+
+
+def slowest_imports(statement: str, top: int):
+    """
+    The ``top`` modules imported directly by ``statement``'s module with
+    the largest cumulative import time (from -X importtime).
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nesting is shown as two spaces per level; keep level 1
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per case')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list for main')
+    args = parser.parse_args()
+    
+    print(f"{args.runs} fresh interpreters per case, Python {sys.version.split()[0]}\n")
+    for name, statement in CASES:
+        try:
+            times, heavy = measure(statement, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"   {name:<30} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"   {name:<30} median {statistics.median(times) * 1000:7.1f} ms  "
+              f"min {min(times) * 1000:7.1f} ms  loaded: {heavy or '-'}")
+    
+    if args.top:
+        print("\nSlowest imports made by main.py:")
+        for cumulative, name in slowest_imports("import main", args.top):
+            print(f"   {cumulative / 1000:7.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Transport benchmark: default requests.Session vs. the tuned transport
+from src/transport.py, against a local keep-alive HTTP server.
+
+Usage:
+    python benchmarks/bench_transport.py [--requests 600] [--concurrency 24]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from src.transport import configure_transport, transport_stats  # noqa: E402
+
+# A homework-list-sized JSON payload
+PAYLOAD = json.dumps({
+    'result': 'success',
+    'object': {
+        'iTotalRecords': 40,
+        'aaData': [
+            {'zyid': f'zy{i:06d}', 'bt': f'第{i}次作业', 'jzsj': '2024-12-31 23:59',
+             'sm': '请按要求完成并提交实验报告。' * 8}
+            for i in range(40)
+        ],
+    },
+}, ensure_ascii=False).encode('utf-8')
+PAYLOAD_GZIP = gzip.compress(PAYLOAD)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    connections = set()
+    bytes_sent = 0
+    lock = threading.Lock()
+    latency = 0.02
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        time.sleep(self.latency)
+        
+        gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = PAYLOAD_GZIP if gzip_ok else PAYLOAD
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        if gzip_ok:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+        
+        with _Handler.lock:
+            _Handler.connections.add(self.client_address)
+            _Handler.bytes_sent += len(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def run(name: str, session: requests.Session, url: str, total: int, concurrency: int):
+    _Handler.connections = set()
+    _Handler.bytes_sent = 0
+    
+    def call(i):
+        response = session.post(url, data={'wlkcid': 'c', 'page': 1, 'size': 100}, timeout=10)
+        response.raise_for_status()
+        return len(response.json()['object']['aaData'])
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = sum(executor.map(call, range(total)))
+    elapsed = time.perf_counter() - start
+    
+    assert rows == total * 40
+    stats = transport_stats(session, url)
+    print(f"   {name:<20} {elapsed:6.2f}s  {total / elapsed:7.0f} req/s  "
+          f"{len(_Handler.connections):4d} connections  "
+          f"{_Handler.bytes_sent / 1024:8.0f} KiB on the wire")
+    if stats:
+        print(f"   {'':<20} client counters: {stats['requests']} requests, "
+              f"{stats['connections']} connections, reuse {stats['reuse_ratio']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=24)
+    parser.add_argument('--latency', type=float, default=0.02, help='server delay per request (s)')
+    args = parser.parse_args()
+    _Handler.latency = args.latency
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/b/wlxt/kczy/zy/student/index/zyListWj"
+    
+    print(f"{args.requests} POSTs, {args.concurrency} threads, {args.latency * 1000:.0f} ms latency, "
+          f"{len(PAYLOAD)} B payload ({len(PAYLOAD_GZIP)} B gzipped)\n")
+    
+    plain = requests.Session()
+    plain.headers['Accept-Encoding'] = 'identity'
+    run("plain, uncompressed", plain, url, args.requests, args.concurrency)
+    run("default Session", requests.Session(), url, args.requests, args.concurrency)
+    run("tuned transport", configure_transport(requests.Session()), url,
+        args.requests, args.concurrency)
+    
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
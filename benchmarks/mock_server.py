@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the 网络学堂 student API, for benchmarks and offline runs.
+
+Serves the semester list, course list and the three homework list
+endpoints with the same payload shapes as the real server (wlkcid, kcm,
+zyid, jzsj, object.aaData, iTotalRecords, paging by page/size), plus
+the assignment page (viewCj), the course file list and file downloads
+(with Range support). Course and row counts, file sizes, per-request
+latency, an error rate and dropped transfers are tunable.
+
+Usage:
+    python benchmarks/mock_server.py [--port 8765] [--courses 12] [--rows 30]
+    WLXT_BASE_URL=http://127.0.0.1:8765 python main.py ...
+
+Authentication is not checked, so point only API-based code at it
+(e.g. HomeworkCrawler with a plain requests.Session).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+SEMESTERS = ['2024-2025-1', '2023-2024-3', '2023-2024-2']
+
+# Homework list endpoint (last path segment) -> index into each course's lists
+HOMEWORK_LISTS = {'zyListWj': 0, 'zyListYjwg': 1, 'zyListYpg': 2}
+
+
+class MockWlxtServer:
+    """
+    Threaded HTTP server answering like learn.tsinghua.edu.cn.
+    
+    Every course has ``rows`` homework items in each of the unsubmitted,
+    submitted and graded lists. Data is generated from ``seed``, so two
+    servers with the same settings serve identical payloads.
+    """
+    
+    def __init__(
+        self,
+        courses: int = 12,
+        rows: int = 30,
+        latency: float = 0.02,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        files: int = 3,
+        file_size: int = 256 * 1024,
+        drop_rate: float = 0.0,
+    ):
+        """
+        Args:
+            courses: Number of enrolled courses
+            rows: Homework items per course and list
+            latency: Delay added to every response (seconds)
+            error_rate: Share of requests answered with 503 (0..1)
+            seed: Seed for the generated data and the injected errors
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            files: Course files per course; the first one is the same
+                   file in every course (to exercise deduplication)
+            file_size: Size of each downloadable file in bytes
+            drop_rate: Share of downloads cut off halfway (0..1)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.files = files
+        self.file_size = file_size
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.errors = 0
+        self.configure(courses, rows, seed)
+        
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def configure(self, courses: int, rows: int, seed: int = 0):
+        """Regenerate the served data (the server may be running)."""
+        rng = random.Random(seed)
+        start = datetime(2024, 9, 9, 23, 59)
+        
+        course_list = []
+        homework = {}
+        rows_by_id = {}
+        for c in range(courses):
+            wlkcid = f"2024-2025-1{c:012d}"
+            course_list.append({
+                'wlkcid': wlkcid,
+                'kcm': f"课程{c + 1:02d}",
+                'jsm': f"教师{c + 1:02d}",
+                'kch': f"{30240000 + c}",
+                'xnxq': SEMESTERS[0],
+            })
+            homework[wlkcid] = [
+                [self._homework_row(rng, wlkcid, status, i, start) for i in range(rows)]
+                for status in range(len(HOMEWORK_LISTS))
+            ]
+            for status_rows in homework[wlkcid]:
+                rows_by_id.update((row['zyid'], row) for row in status_rows)
+        
+        with self._lock:
+            self.courses = course_list
+            self.homework = homework
+            self.rows_by_id = rows_by_id
+    
+    @staticmethod
+    def _homework_row(rng: random.Random, wlkcid: str, status: int, i: int,
+                      start: datetime) -> dict:
+        deadline = start + timedelta(days=rng.randint(0, 120), minutes=-rng.choice([0, 0, 60]))
+        return {
+            'zyid': f"{wlkcid[-6:]}{status}{i:05d}",
+            'xszyid': f"xs{wlkcid[-6:]}{status}{i:05d}",
+            'wlkcid': wlkcid,
+            'bt': f"第{i + 1}次作业",
+            # The real API sends epoch milliseconds
+            'jzsj': int(deadline.timestamp() * 1000),
+            'kssj': int((deadline - timedelta(days=7)).timestamp() * 1000),
+            'sm': '请按要求完成并提交实验报告。' * rng.randint(1, 6),
+            'zt': ['未提交', '已提交', '已批阅'][status],
+        }
+    
+    # Request handling
+    
+    def handle(self, path: str, form: Dict[str, str]):
+        """Return (status, payload) for one request."""
+        endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if fail:
+            return 503, {'result': 'error', 'msg': 'Service Unavailable'}
+        
+        if endpoint == 'loadSemesterIdList':
+            return 200, {'result': 'success', 'resultList': [{'id': s} for s in SEMESTERS]}
+        
+        if endpoint == 'loadCourseBySemesterId':
+            courses = self.courses if form.get('semester') == SEMESTERS[0] else []
+            return 200, {'result': 'success', 'resultList': courses}
+        
+        if endpoint in HOMEWORK_LISTS:
+            rows = self.homework.get(form.get('wlkcid', ''))
+            rows = rows[HOMEWORK_LISTS[endpoint]] if rows else []
+            size = _int(form.get('size'), 10)
+            page = max(1, _int(form.get('page'), 1))
+            return 200, {
+                'result': 'success',
+                'object': {
+                    'iTotalRecords': len(rows),
+                    'iTotalDisplayRecords': len(rows),
+                    'aaData': rows[(page - 1) * size:page * size],
+                },
+            }
+        
+        if endpoint == 'kjxxbByWlkcidAndSizeForStudent':
+            wlkcid = form.get('wlkcid', '')
+            files = [
+                {
+                    'wjid': 'shared' if n == 0 else f"{wlkcid[-6:]}f{n}",
+                    'bt': '课程须知' if n == 0 else f"第{n}讲课件",
+                    'wjlx': 'pdf',
+                    'wjdx': self.file_size,
+                    'wlkcid': wlkcid,
+                }
+                for n in range(self.files)
+            ] if wlkcid in self.homework else []
+            return 200, {'result': 'success', 'object': files}
+        
+        if endpoint == 'downloadFile':
+            key = form.get('wjid') or f"{form.get('zyid')}/{form.get('fileid')}"
+            return 200, self.file_content(key)
+        
+        if endpoint == 'viewCj':
+            row = self.rows_by_id.get(form.get('zyid', ''))
+            if row is None:
+                return 404, {'result': 'error', 'msg': 'no such homework'}
+            return 200, self._detail_page(row)
+        
+        return 404, {'result': 'error', 'msg': f"no such endpoint: {endpoint}"}
+    
+    @staticmethod
+    def _detail_page(row: dict) -> str:
+        """HTML assignment page laid out like the real viewCj page."""
+        zyid = row['zyid']
+        files = ''.join(
+            f'<span class="ftitle"><a href="/b/wlxt/kczy/zy/student/downloadFile'
+            f'?zyid={zyid}&fileid={n}">{row["bt"]}_附件{n}.pdf</a></span>'
+            for n in range(1, int(zyid[-1]) % 3 + 1)
+        )
+        feedback = ''
+        if row['zt'] == '已批阅':
+            feedback = ('<div class="list calendar clearfix"><div class="fl left">评语</div>'
+                        '<div class="fl right"><div class="c55">完成得很好。</div></div></div>')
+        return (
+            '<html><body><div class="boxdetail">'
+            f'<div class="list"><div class="fl left">作业标题</div><div class="fl right">{row["bt"]}</div></div>'
+            '<div class="list calendar clearfix"><div class="fl left">作业说明</div>'
+            f'<div class="fl right"><div class="c55">{row["sm"]}</div></div></div>'
+            '<div class="list fujian clearfix"><div class="fl left">作业附件</div>'
+            f'<div class="fl right">{files}</div></div>'
+            f'{feedback}'
+            '</div></body></html>'
+        )
+    
+    def file_content(self, key: str) -> bytes:
+        """Deterministic pseudo-random content for a file id."""
+        block = hashlib.sha256(key.encode('utf-8')).digest() * 128  # 4 KiB
+        return (block * (self.file_size // len(block) + 1))[:self.file_size]
+    
+    def should_drop(self) -> bool:
+        with self._lock:
+            return self.drop_rate > 0 and self._random.random() < self.drop_rate
+    
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {}
+            self.errors = 0
+    
+    # Lifecycle
+    
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+    
+    def serve_forever(self):
+        self._server.serve_forever()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _int(value: Optional[str], default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _make_handler(mock: MockWlxtServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real server
+        
+        def do_GET(self):
+            url = urlsplit(self.path)
+            self._respond(url.path, parse_qs(url.query))
+        
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8')
+            url = urlsplit(self.path)
+            form = parse_qs(url.query)
+            form.update(parse_qs(body))
+            self._respond(url.path, form)
+        
+        def _respond(self, path: str, query: Dict[str, List[str]]):
+            if mock.latency:
+                time.sleep(mock.latency)
+            status, payload = mock.handle(path, {k: v[0] for k, v in query.items()})
+            
+            if isinstance(payload, bytes):
+                self._send_file(payload)
+                return
+            if isinstance(payload, str):
+                content_type = 'text/html;charset=UTF-8'
+                body = payload.encode('utf-8')
+            else:
+                content_type = 'application/json;charset=UTF-8'
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '')
+            if gzip_ok:
+                body = gzip.compress(body, compresslevel=5)
+            
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if gzip_ok:
+                self.send_header('Content-Encoding', 'gzip')
+            if status == 503:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def _send_file(self, content: bytes):
+            """Send a download, honouring "Range: bytes=N-" and If-Range."""
+            start = 0
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            range_header = self.headers.get('Range', '')
+            if_range = self.headers.get('If-Range')
+            if if_range is not None and if_range != etag:
+                range_header = ''  # the file changed: send all of it
+            if range_header.startswith('bytes=') and range_header.endswith('-'):
+                start = _int(range_header[len('bytes='):-1], 0)
+                if start >= len(content):
+                    self.send_response(416)
+                    self.send_header('Content-Range', f"bytes */{len(content)}")
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+            
+            body = content[start:]
+            self.send_response(206 if start else 200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            if start:
+                self.send_header('Content-Range', f"bytes {start}-{len(content) - 1}/{len(content)}")
+            self.end_headers()
+            
+            if mock.should_drop():
+                # Cut the transfer off halfway, like a dropped connection
+                self.wfile.write(body[:len(body) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--courses', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=30, help='homework per course and list')
+    parser.add_argument('--latency', type=float, default=0.02, help='delay per request (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 answers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--files', type=int, default=3, help='course files per course')
+    parser.add_argument('--file-size', type=int, default=256 * 1024, help='bytes per file')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='share of downloads cut off halfway')
+    args = parser.parse_args()
+    
+    server = MockWlxtServer(
+        courses=args.courses,
+        rows=args.rows,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+        files=args.files,
+        file_size=args.file_size,
+        drop_rate=args.drop_rate,
+    )
+    print(f"🧪 Mock 网络学堂 API on {server.base_url} "
+          f"({args.courses} courses, {args.rows} rows per list)")
+    print(f"   export WLXT_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -6,65 +6,166 @@ Fetches all homework assignments using Selenium (full browser automation).
 Usage:
     python main.py              # Fetch homework for current semester
     python main.py --json       # Also generate JSON output
+    python main.py --ndjson     # Also generate NDJSON output (one record per line)
     python main.py --debug      # Save page HTML for debugging
+    python main.py --refresh    # Discard cached semester/course responses
+    python main.py --incremental  # Only refetch courses whose homework changed
+    python main.py --xhr        # Fetch homework via in-browser API calls (no page loads)
+    python main.py --api        # Call the JSON API with the saved session (no browser)
+    python main.py --api --download  # Also download attachments and course files
+    python main.py --headless   # Reuse the saved session in headless Chrome
+    python main.py --batch accounts.json  # Crawl many accounts in parallel
+    python main.py --store      # Record this crawl in the SQLite history store
+    python main.py --watch      # Keep polling, faster when deadlines are near
+    python main.py --metrics    # Write a phase trace and a Prometheus textfile
+    python main.py --profile    # Profile each phase (results in output/profile/)
 """
 import argparse
+import hashlib
 import sys
-import time
 import os
 import re
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+from src.auth import WebLearningAuth
+from src.batch import load_accounts, run_batch
+from src.cache import DetailCache, ResponseCache
+from src.metrics import metrics, span
+from src.models import Clock, Course, Homework
+from src.profiling import PhaseProfiler
+from src.store import HomeworkStore
+from src.snapshot import (
+    load_snapshot,
+    save_snapshot,
+    snapshot_entry,
+    entry_expired,
+    homework_from_dict,
+)
+from src.crawler import CrawlError, HomeworkCrawler
+from src.deadline import parse_deadline
+from src.download import Downloader, course_file_jobs, homework_jobs
+from src.output import generate_html, generate_json, generate_ndjson, generate_metrics
+from src.config import (
+    LOGIN_URL,
+    BASE_URL,
+    HOMEWORK_LIST_URL,
+    HOMEWORK_PAGE_SIZE,
+    HOMEWORK_MAX_PAGES,
+    XHR_SCRIPT_TIMEOUT,
+    PAGE_READY_TIMEOUT,
+    STORE_FILE,
+    OUTPUT_DIR,
+    DOWNLOAD_DIR,
+)
+from src.watch import watch
+
+# Selenium and BeautifulSoup (src.browser, src.waits, src.parsing) are
+# imported where a browser or page scraping is needed, so --api, --watch
+# and --batch never load them
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+# Runs inside the logged-in page: POSTs the homework list API for every
+# course in parallel (following pagination) and hands the JSON rows back.
+_XHR_FETCH_SCRIPT = """
+const [courseIds, url, pageSize, maxPages, done] = arguments;
+const match = document.cookie.match(/(?:^|; )XSRF-TOKEN=([^;]*)/);
+const token = match ? decodeURIComponent(match[1]) : '';
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+async function fetchPage(wlkcid, page) {
+    const body = new URLSearchParams({wlkcid: wlkcid, size: String(pageSize), page: String(page)});
+    const response = await fetch(url, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            'X-XSRF-TOKEN': token,
+        },
+        body: body,
+    });
+    if (!response.ok) {
+        throw new Error('HTTP ' + response.status);
+    }
+    const data = await response.json();
+    const result = (data && typeof data.object === 'object' && data.object) || {};
+    return {rows: result.aaData || [], total: result.iTotalRecords};
+}
 
-from src.models import Course, Homework
-from src.output import generate_html, generate_json
-from src.config import LOGIN_URL, BASE_URL
+async function fetchCourse(wlkcid) {
+    const rows = [];
+    let firstId = null;
+    for (let page = 1; page <= maxPages; page++) {
+        const result = await fetchPage(wlkcid, page);
+        // A server that ignores "page" sends the previous page again
+        const pageFirstId = result.rows.length ? result.rows[0].zyid : null;
+        if (page > 1 && pageFirstId !== null && pageFirstId === firstId) {
+            return rows;
+        }
+        firstId = pageFirstId;
+        rows.push(...result.rows);
+        const total = result.total == null ? null : Number(result.total);
+        if (result.rows.length < pageSize || (total !== null && rows.length >= total)) {
+            return rows;
+        }
+    }
+    return rows;
+}
+
+Promise.all(courseIds.map(id => fetchCourse(id).then(
+    rows => ({id: id, rows: rows}),
+    error => ({id: id, error: String(error)})
+))).then(done);
+"""
+
+# Homework id (zyid) in a scraped row's links, e.g. "...viewZy?wlkcid=..&zyid=.."
+# (not the submission id "xszyid")
+_ZYID_PATTERN = re.compile(r'[?&]zyid=([\w-]+)')
 
 
 class WebLearningCrawler:
     """
     Full Selenium-based crawler for 网络学堂.
     Opens browser, lets user login, then scrapes courses and homework.
+    
+    In headless mode the saved session is restored instead of logging in,
+    and homework pages are scraped in parallel by a pool of headless drivers.
     """
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, headless: bool = False):
         self.driver = None
+        self.pool = None
         self.courses = []
         self.homework_list = []
         self.debug = debug
+        self.headless = headless
     
-    def _create_driver(self) -> webdriver.Chrome:
+    def _create_driver(self) -> "webdriver.Chrome":
         """Create and configure Chrome WebDriver."""
-        options = Options()
-        # Keep browser open for debugging
-        options.add_experimental_option('detach', True)
-        # Suppress unnecessary logging
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        # Disable automation flags
-        options.add_argument('--disable-blink-features=AutomationControlled')
+        from src.browser import create_driver
         
-        driver = webdriver.Chrome(options=options)
-        driver.set_window_size(1200, 900)
-        return driver
+        # Keep browser open for debugging
+        return create_driver(headless=self.headless, detach=not self.headless)
     
-    def _save_debug_html(self, name: str):
+    def _save_debug_html(self, name: str, driver: "webdriver.Chrome" = None):
         """Save current page HTML for debugging."""
-        if self.debug and self.driver:
+        driver = driver or self.driver
+        if self.debug and driver:
             os.makedirs('debug', exist_ok=True)
             filepath = f'debug/{name}.html'
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
+                f.write(driver.page_source)
             print(f"   [DEBUG] Saved page to {filepath}")
     
     def start(self):
         """Start the browser and navigate to login page."""
+        if self.headless:
+            self._start_headless()
+            return
+        
         print("🔐 Opening browser...")
         self.driver = self._create_driver()
         
@@ -77,8 +178,34 @@ class WebLearningCrawler:
         print("   The script will continue automatically after login")
         print("="*50 + "\n")
     
+    def _start_headless(self):
+        """Restore the saved session into headless Chrome (no login page)."""
+        from src.browser import DriverPool
+        
+        auth = WebLearningAuth()
+        if auth.restore_session() is None:
+            raise RuntimeError(
+                "--headless needs a saved session - run once without --headless to log in"
+            )
+        
+        print("🔐 Starting headless browser...")
+        self.pool = DriverPool(cookies=auth.cookies)
+        # The landing page is read with a pooled driver (it already has the
+        # cookies); it goes back to the pool before the course pages are scraped
+        self.driver = self.pool.acquire()
+        self.driver.get(f"{BASE_URL}/f/wlxt/index/course/student/")
+    
     def wait_for_login(self, timeout: int = 300) -> bool:
         """Wait for user to complete login."""
+        with span('login', headless=self.headless):
+            return self._wait_for_login(timeout)
+    
+    def _wait_for_login(self, timeout: int) -> bool:
+        """wait_for_login() body, timed as the "login" span."""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+        from src.waits import wait_for, element_present
+        
         try:
             # Wait until we're on the course list page
             WebDriverWait(self.driver, timeout).until(
@@ -86,13 +213,27 @@ class WebLearningCrawler:
                 or 'suoxuecourse' in d.page_source
             )
             print("✅ Login successful!")
-            time.sleep(2)  # Let page fully load
-            
-            self._save_debug_html('after_login')
-            return True
         except TimeoutException:
             print("❌ Login timeout")
             return False
+        
+        # Save the session so later runs (e.g. --headless) can skip the login
+        if not self.headless:
+            WebLearningAuth().capture_session(self.driver)
+        
+        # Wait for the course cards rather than a fixed delay
+        try:
+            wait_for(
+                self.driver,
+                element_present('#suoxuecourse .item'),
+                PAGE_READY_TIMEOUT,
+                "Course list",
+            )
+        except TimeoutException as e:
+            print(f"   ⚠️ {e.msg}")
+        
+        self._save_debug_html('after_login')
+        return True
     
     def fetch_courses_and_homework_urls(self) -> list:
         """
@@ -101,10 +242,22 @@ class WebLearningCrawler:
         """
         print("📚 Parsing course list and homework links...")
         
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        with span('courses'):
+            courses = self._parse_courses()
+        
+        print(f"   Found {len(courses)} courses")
+        for c in courses:
+            print(f"      • {c['name']} ({c['unsubmitted']} unsubmitted)")
+        
+        self.courses = courses
+        return courses
+    
+    def _parse_courses(self) -> list:
+        """Extract the course cards from the landing page."""
+        from src.parsing import find_course_container
         
         # Find the course container
-        course_container = soup.find('div', id='suoxuecourse')
+        course_container = find_course_container(self.driver.page_source)
         if not course_container:
             print("   ⚠️ Could not find course container")
             return []
@@ -147,10 +300,12 @@ class WebLearningCrawler:
                 
                 # Get unsubmitted count
                 unsubmitted = 0
+                homework_li_text = ''
                 # Look for the homework li and its count
                 for li in item.find_all('li'):
                     li_text = li.get_text()
                     if '作业' in li_text and '未提交' in li_text:
+                        homework_li_text = li.get_text(' ', strip=True)
                         # Extract number
                         count_a = li.find('a', class_='counte')
                         if count_a:
@@ -160,77 +315,203 @@ class WebLearningCrawler:
                                 pass
                         break
                 
+                # Change fingerprint: what the landing page says about homework
+                fingerprint = hashlib.sha1(
+                    f"{homework_link}|{homework_li_text}".encode('utf-8')
+                ).hexdigest()
+                
                 courses.append({
                     'name': course_name,
                     'wlkcid': wlkcid,
                     'teacher': teacher,
                     'homework_url': homework_link,
                     'unsubmitted': unsubmitted,
+                    'fingerprint': fingerprint,
                 })
                 
             except Exception as e:
                 if self.debug:
                     print(f"   ⚠️ Error parsing course: {e}")
         
-        print(f"   Found {len(courses)} courses")
-        for c in courses:
-            print(f"      • {c['name']} ({c['unsubmitted']} unsubmitted)")
-        
-        self.courses = courses
         return courses
     
-    def fetch_all_homework(self) -> list:
+    def fetch_all_homework(self, snapshot: dict = None) -> list:
         """
         Fetch homework from all courses by navigating to each homework URL.
+        
+        Args:
+            snapshot: Previous run's per-course snapshot (incremental mode).
+                      Courses whose unsubmitted count and fingerprint are
+                      unchanged are taken from it instead of being refetched.
         """
         print("\n📝 Fetching homework details...")
         
         all_homework = []
+        new_snapshot = {}
+        to_fetch = []
         
         for i, course in enumerate(self.courses):
             if not course['homework_url']:
                 continue
             
-            print(f"\n   [{i+1}/{len(self.courses)}] {course['name']}")
+            previous = snapshot.get(course['wlkcid']) if snapshot else None
+            if (previous
+                    and previous['unsubmitted'] == course['unsubmitted']
+                    and previous['fingerprint'] == course['fingerprint']
+                    and not entry_expired(previous)):
+                hw_list = [homework_from_dict(d) for d in previous['homework']]
+                all_homework.extend(hw_list)
+                new_snapshot[course['wlkcid']] = previous
+                print(f"\n   [{i+1}/{len(self.courses)}] {course['name']}")
+                print(f"      Unchanged, reused {len(hw_list)} homework items")
+                continue
             
-            # Navigate to homework page
-            homework_url = BASE_URL + course['homework_url']
-            self.driver.get(homework_url)
-            time.sleep(2)
+            to_fetch.append((i, course))
+        
+        if self.pool:
+            self._release_landing_driver()
             
-            self._save_debug_html(f'homework_{i+1}')
+            # Scrape in parallel, one pooled headless driver per course page
+            def fetch_pooled(job):
+                with self.pool.checkout() as driver:
+                    return self._fetch_course_homework(driver, *job)
             
-            # Scrape homework from this page
-            hw_list = self._scrape_homework_page(course['name'])
+            with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+                results = list(executor.map(fetch_pooled, to_fetch))
+        else:
+            results = [
+                self._fetch_course_homework(self.driver, i, course)
+                for i, course in to_fetch
+            ]
+        
+        for (i, course), (hw_list, ready) in zip(to_fetch, results):
+            all_homework.extend(hw_list)
+            # A page that never loaded (or came back empty despite open
+            # homework on the landing page) must not be reused next run
+            if not ready or (not hw_list and course['unsubmitted'] > 0):
+                continue
+            new_snapshot[course['wlkcid']] = snapshot_entry(
+                course['unsubmitted'], course['fingerprint'], hw_list
+            )
+        
+        save_snapshot(new_snapshot)
+        
+        # Sort by deadline
+        clock = Clock()
+        all_homework.sort(key=lambda h: h.sort_key(clock))
+        
+        self.homework_list = all_homework
+        print(f"\n✅ Found {len(all_homework)} homework assignments total")
+        return all_homework
+    
+    def fetch_all_homework_xhr(self) -> list:
+        """
+        Fetch homework from all courses by calling the homework list API
+        from inside the logged-in page, so no homework page is rendered.
+        All courses are requested in parallel in one script execution.
+        """
+        print("\n📝 Fetching homework via in-browser API calls...")
+        
+        courses = [c for c in self.courses if c['wlkcid']]
+        self.driver.set_script_timeout(XHR_SCRIPT_TIMEOUT)
+        with span('course_homework', courses=len(courses)):
+            results = self.driver.execute_async_script(
+                _XHR_FETCH_SCRIPT,
+                [c['wlkcid'] for c in courses],
+                HOMEWORK_LIST_URL,
+                HOMEWORK_PAGE_SIZE,
+                HOMEWORK_MAX_PAGES,
+            )
+        results_by_id = {r['id']: r for r in results or []}
+        
+        all_homework = []
+        
+        for i, course in enumerate(courses):
+            print(f"\n   [{i+1}/{len(courses)}] {course['name']}")
+            
+            result = results_by_id.get(course['wlkcid'], {'error': 'no response'})
+            if 'error' in result:
+                print(f"      ⚠️ Failed to fetch homework: {result['error']}")
+                continue
+            
+            course_obj = Course(
+                id=course['wlkcid'],
+                name=course['name'],
+                teacher=course['teacher'],
+            )
+            with span('parse', course=course['name'], rows=len(result['rows'])):
+                hw_list = [
+                    HomeworkCrawler.parse_homework_item(row, course_obj, "unsubmitted")
+                    for row in result['rows']
+                ]
             all_homework.extend(hw_list)
             print(f"      Found {len(hw_list)} homework items")
         
         # Sort by deadline
-        all_homework.sort(
-            key=lambda h: (h.deadline is None, h.is_expired, h.deadline or datetime.max)
-        )
+        clock = Clock()
+        all_homework.sort(key=lambda h: h.sort_key(clock))
         
         self.homework_list = all_homework
         print(f"\n✅ Found {len(all_homework)} homework assignments total")
         return all_homework
     
-    def _scrape_homework_page(self, course_name: str) -> list:
-        """Scrape homework from the current homework page."""
-        homework_list = []
+    def _fetch_course_homework(self, driver: "webdriver.Chrome", i: int, course: dict) -> tuple:
+        """
+        Open one course's homework page in ``driver`` and scrape it.
+        
+        Returns:
+            (homework list, whether the homework table finished loading)
+        """
+        from selenium.common.exceptions import TimeoutException
+        from src.waits import wait_for, datatable_drawn
         
-        # Wait for page to load
-        time.sleep(1)
+        print(f"\n   [{i+1}/{len(self.courses)}] {course['name']}")
         
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        with span('course_homework', course=course['name']):
+            # Navigate to homework page
+            homework_url = BASE_URL + course['homework_url']
+            driver.get(homework_url)
+            ready = True
+            try:
+                wait_for(
+                    driver,
+                    datatable_drawn('table#wtj, table.dataTable'),
+                    PAGE_READY_TIMEOUT,
+                    "Homework table",
+                )
+            except TimeoutException as e:
+                print(f"      ⚠️ {e.msg}")
+                ready = False
+            
+            self._save_debug_html(f'homework_{i+1}', driver)
+            
+            # Scrape homework from this page
+            with span('parse', course=course['name']):
+                hw_list = self._scrape_homework_page(course['name'], driver, course['wlkcid'])
+        print(f"      Found {len(hw_list)} homework items")
+        return hw_list, ready
+    
+    def _scrape_homework_page(
+        self,
+        course_name: str,
+        driver: "webdriver.Chrome" = None,
+        course_id: str = "",
+    ) -> list:
+        """
+        Scrape homework from the current homework page.
+        
+        Items are keyed by the zyid in their row's links, so ids stay
+        stable when assignments are added or removed. A row without one
+        gets an empty id.
+        """
+        from src.parsing import find_homework_table
+        
+        homework_list = []
+        driver = driver or self.driver
         
         # The homework page typically has tabs: "未提交" (unsubmitted), "已完成" (completed)
         # Let's get homework from the table
-        
-        # Find table rows
-        table = soup.find('table', id='wtj')  # wtj = 未提交 (unsubmitted)
-        if not table:
-            # Try alternative selector
-            table = soup.find('table', class_='dataTable')
+        table = find_homework_table(driver.page_source)
         
         if not table:
             return []
@@ -276,21 +557,19 @@ class WebLearningCrawler:
                 if not title:
                     continue
                 
+                links = ' '.join(
+                    f"{a.get('href', '')} {a.get('onclick', '')}" for a in row.find_all('a')
+                )
+                zyid_match = _ZYID_PATTERN.search(links)
+                
                 # Parse deadline
-                deadline = None
-                if deadline_str:
-                    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]:
-                        try:
-                            deadline = datetime.strptime(deadline_str, fmt)
-                            break
-                        except ValueError:
-                            continue
+                deadline = parse_deadline(deadline_str)
                 
                 hw = Homework(
-                    id=f"{course_name}_{len(homework_list)}",
+                    id=zyid_match.group(1) if zyid_match else "",
                     title=title,
                     course_name=course_name,
-                    course_id="",
+                    course_id=course_id,
                     deadline=deadline,
                     deadline_str=deadline_str,
                     status="expired" if time_left == "已过期" else "unsubmitted",
@@ -304,8 +583,18 @@ class WebLearningCrawler:
         
         return homework_list
     
+    def _release_landing_driver(self):
+        """Give the pooled driver used for the landing page back to the pool."""
+        if self.pool and self.driver:
+            self.pool.release(self.driver)
+            self.driver = None
+    
     def close(self):
         """Close all browser windows."""
+        if self.pool:
+            self._release_landing_driver()
+            self.pool.close()
+            self.pool = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -314,6 +603,165 @@ class WebLearningCrawler:
             self.driver = None
 
 
+def write_metrics(output_dir: str, homework_list, failures=(), started: float = None):
+    """Set the crawl-level gauges and export the metrics files."""
+    metrics.set_gauge('homework', len(homework_list or []), 'Homework items found by the last crawl.')
+    metrics.set_gauge('failed_lists', len(failures), 'Homework lists that could not be fetched.')
+    metrics.set_gauge('last_success', int(homework_list is not None),
+                      'Whether the last crawl produced a homework list.')
+    metrics.set_gauge('last_run_timestamp_seconds', round(time.time()),
+                      'Unix time of the last crawl.')
+    if started is not None:
+        metrics.set_gauge('run_duration_seconds', round(time.perf_counter() - started, 3),
+                          'Wall time of the last run.')
+    generate_metrics(output_dir)
+
+
+def run_watch(args) -> int:
+    """Run watch mode on a saved (or freshly logged-in) API session."""
+    auth = WebLearningAuth()
+    session = auth.login()
+    crawler = HomeworkCrawler(session, cache=ResponseCache(), refresh=args.refresh)
+    
+    def write_reports(homework_list):
+        print("\n📊 Homework changed, regenerating reports...")
+        generate_html(homework_list)
+        if args.json:
+            generate_json(homework_list, compact=args.compact, failures=crawler.failures)
+        if args.ndjson:
+            generate_ndjson(homework_list)
+        if args.store:
+            with HomeworkStore() as store:
+                store.record_crawl(homework_list, crawler.get_courses())
+    
+    def export_metrics(homework_list):
+        write_metrics(args.metrics, homework_list, crawler.failures)
+    
+    try:
+        watch(
+            crawler,
+            write_reports,
+            on_poll=export_metrics if args.metrics else None,
+            auth=auth,
+        )
+    except KeyboardInterrupt:
+        print("\n\n👋 Stopped watching")
+    except RuntimeError as e:
+        print(f"\n❌ {e}")
+        return 1
+    return 0
+
+
+def download_files(crawler: HomeworkCrawler, homework_list: list, root: str):
+    """
+    Download homework attachments and course files of the current semester.
+    Homework whose details, or courses whose file lists, could not be
+    loaded are skipped and listed in the report's failures.
+    """
+    crawler.load_details(homework_list)
+    failed = [
+        f"{hw.course_name} / {hw.title}: details not loaded ({hw.detail_error})"
+        for hw in homework_list if hw.detail_error is not None
+    ]
+    try:
+        courses = crawler.get_courses()
+    except CrawlError as e:
+        failed.append(f"course files: {e}")
+        courses = []
+    known_failures = len(crawler.failures)
+    course_files = crawler.get_all_course_files(courses)
+    failed += [
+        f"{f.course_name}: file list not loaded ({f.error})"
+        for f in crawler.failures[known_failures:]
+    ]
+    
+    jobs = homework_jobs(homework_list) + course_file_jobs(course_files)
+    downloader = Downloader(crawler.session, root=root, policy=crawler.policy)
+    report = downloader.download(jobs)
+    for failure in failed:
+        print(f"   ⚠️ Not downloaded: {failure}")
+    report.failed += failed
+    return report
+
+
+def run_api(args) -> int:
+    """
+    Crawl through the JSON API with HomeworkCrawler on a saved session.
+    A browser is only opened if there is no working saved session.
+    """
+    started = time.perf_counter()
+    profiler = PhaseProfiler(memory=args.profile_memory) if args.profile else None
+    
+    def phase(name: str):
+        return profiler.phase(name) if profiler else nullcontext()
+    
+    session = WebLearningAuth().login()
+    crawler = HomeworkCrawler(
+        session,
+        cache=ResponseCache(),
+        refresh=args.refresh,
+        detail_cache=DetailCache(),
+    )
+    
+    # Without details, NDJSON records are written as each course finishes
+    stream_ndjson = args.ndjson and not args.details
+    
+    try:
+        with phase('homework'):
+            if stream_ndjson:
+                homework_list = []
+                
+                def produced():
+                    for hw in crawler.iter_all_homework():
+                        homework_list.append(hw)
+                        yield hw
+                
+                generate_ndjson(produced())
+                homework_list = crawler.finish_crawl(homework_list)
+            else:
+                homework_list = crawler.get_all_homework()
+            if args.details:
+                crawler.load_details(homework_list)
+        
+        print("\n📊 Generating reports...")
+        with phase('render'):
+            html_path = generate_html(homework_list)
+            if args.json:
+                generate_json(
+                    homework_list,
+                    compact=args.compact,
+                    failures=crawler.failures,
+                    details=args.details,
+                )
+            if args.ndjson and not stream_ndjson:
+                generate_ndjson(homework_list, details=args.details)
+        
+        if args.store:
+            with HomeworkStore() as store:
+                changes = store.record_crawl(homework_list, crawler.get_courses())
+            print(f"🗄️ Recorded crawl in {STORE_FILE} ({changes} deadline changes)")
+        
+        download_failed = False
+        if args.download:
+            print()
+            with phase('download'):
+                report = download_files(crawler, homework_list, args.download)
+            download_failed = bool(report.failed)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        if args.metrics:
+            write_metrics(args.metrics, None, started=started)
+        return 1
+    
+    if args.metrics:
+        write_metrics(args.metrics, homework_list, crawler.failures, started)
+    if profiler:
+        profiler.write()
+    
+    print(f"\n✅ Done! Open {html_path} in your browser to view homework.")
+    return 1 if crawler.failures or download_failed else 0
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Fetch homework from 网络学堂 (Web Learning)'
@@ -323,6 +771,16 @@ def main():
         action='store_true',
         help='Also generate JSON output'
     )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write the JSON output without indentation'
+    )
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='Also generate NDJSON output (one homework record per line)'
+    )
     parser.add_argument(
         '--no-close',
         action='store_true',
@@ -333,15 +791,124 @@ def main():
         action='store_true',
         help='Save page HTML for debugging'
     )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Discard cached semester and course-list responses'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only refetch courses whose homework changed since the last run'
+    )
+    parser.add_argument(
+        '--xhr',
+        action='store_true',
+        help='Fetch homework through API calls made by the logged-in page '
+             'instead of opening every course page'
+    )
+    parser.add_argument(
+        '--api',
+        action='store_true',
+        help='Fetch everything through the JSON API with the saved session '
+             '(no browser unless a new login is needed)'
+    )
+    parser.add_argument(
+        '--details',
+        action='store_true',
+        help='With --api, fetch each assignment page and add its text, '
+             'attachments and feedback to the JSON/NDJSON output '
+             '(cached until the assignment changes)'
+    )
+    parser.add_argument(
+        '--download',
+        nargs='?',
+        const=DOWNLOAD_DIR,
+        metavar='DIR',
+        help='With --api, download homework attachments and course files '
+             'to DIR (default: downloads/); interrupted files are resumed '
+             'and identical files are stored once'
+    )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help='Restore the saved session in headless Chrome and scrape '
+             'homework pages in parallel (run once without it to log in)'
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='ACCOUNTS_FILE',
+        help='Crawl every account in a JSON list of stored sessions '
+             '(reports go to output/<account>/)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of processes for --batch (default: CPU cores)'
+    )
+    parser.add_argument(
+        '--store',
+        action='store_true',
+        help='Record the crawl in the SQLite history store '
+             '(query it with python -m src.store)'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep one API session alive and poll for changes, more often '
+             'when a deadline is near (reports are rewritten only on change)'
+    )
+    parser.add_argument(
+        '--metrics',
+        nargs='?',
+        const=OUTPUT_DIR,
+        metavar='DIR',
+        help='Write a phase trace (metrics_trace.json) and a Prometheus '
+             'textfile (wlxt.prom) to DIR (default: output/)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile course parsing, homework fetching and report '
+             'generation separately (login wait excluded); '
+             'results go to output/profile/'
+    )
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='With --profile, also record peak memory per phase (slower)'
+    )
     
     args = parser.parse_args()
     
+    if args.refresh:
+        ResponseCache().clear()
+    
+    if args.batch:
+        results = run_batch(
+            load_accounts(args.batch),
+            workers=args.workers,
+            store_path=STORE_FILE if args.store else None,
+        )
+        return 0 if all(r.ok for r in results) else 1
+    
+    if args.watch:
+        return run_watch(args)
+    
+    if args.api:
+        return run_api(args)
+    
     print("=" * 50)
     print("    网络学堂 Homework Crawler")
     print("=" * 50)
     print()
     
-    crawler = WebLearningCrawler(debug=args.debug)
+    started = time.perf_counter()
+    crawler = WebLearningCrawler(debug=args.debug, headless=args.headless)
+    profiler = PhaseProfiler(memory=args.profile_memory) if args.profile else None
+    
+    def phase(name: str):
+        return profiler.phase(name) if profiler else nullcontext()
     
     try:
         # Step 1: Start browser and show login page
@@ -353,7 +920,8 @@ def main():
             return 1
         
         # Step 3: Parse courses and homework URLs from landing page
-        crawler.fetch_courses_and_homework_urls()
+        with phase('courses'):
+            crawler.fetch_courses_and_homework_urls()
         
         if not crawler.courses:
             print("\n⚠️ No courses found!")
@@ -362,23 +930,50 @@ def main():
             return 1
         
         # Step 4: Fetch homework from each course
-        homework_list = crawler.fetch_all_homework()
+        with phase('homework'):
+            if args.xhr:
+                homework_list = crawler.fetch_all_homework_xhr()
+            else:
+                snapshot = load_snapshot() if args.incremental else None
+                homework_list = crawler.fetch_all_homework(snapshot)
         
         if not homework_list:
             print("\n⚠️ No homework found!")
         else:
             # Step 5: Generate output
             print("\n📊 Generating reports...")
-            html_path = generate_html(homework_list)
+            with phase('render'):
+                html_path = generate_html(homework_list)
+                
+                if args.json:
+                    generate_json(homework_list, compact=args.compact)
+                if args.ndjson:
+                    generate_ndjson(homework_list)
             
-            if args.json:
-                generate_json(homework_list)
+            if args.store:
+                courses = [
+                    Course(id=c['wlkcid'], name=c['name'], teacher=c['teacher'])
+                    for c in crawler.courses
+                ]
+                # History is keyed by zyid; rows scraped without one can't be tracked
+                keyed = [hw for hw in homework_list if hw.id]
+                if len(keyed) < len(homework_list):
+                    print(f"⚠️ {len(homework_list) - len(keyed)} homework items have no id "
+                          f"on the page and were not recorded (--api records them all)")
+                with HomeworkStore() as store:
+                    changes = store.record_crawl(keyed, courses)
+                print(f"🗄️ Recorded crawl in {STORE_FILE} ({changes} deadline changes)")
             
             print("\n" + "=" * 50)
             print("✅ Done!")
             print(f"   Open {html_path} in your browser to view homework.")
             print("=" * 50)
         
+        if args.metrics:
+            write_metrics(args.metrics, homework_list, started=started)
+        if profiler:
+            profiler.write()
+        
         # Close browser unless --no-close specified
         if not args.no_close:
             print("\n🔒 Closing browser...")
@@ -395,6 +990,8 @@ def main():
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
+        if args.metrics:
+            write_metrics(args.metrics, None, started=started)
         return 1
 
 
@@ -0,0 +1,44 @@
+"""
+Atomic file writes: content goes to a uniquely named temp file next to
+the target and is renamed over it once complete, so readers never see a
+partial file and concurrent writers never share a temp file.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+@contextmanager
+def atomic_open(path: str, permissions: int = 0o644) -> Iterator[IO[str]]:
+    """
+    Open a temporary file next to ``path`` for writing (UTF-8 text) and
+    rename it over ``path`` once the block finishes; on error the temp
+    file is removed and ``path`` is left as it was.
+
+    Args:
+        path: File to write; its directory must exist
+        permissions: Mode of the written file (e.g. 0o600 for secrets)
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp'
+    )
+    try:
+        os.chmod(tmp_path, permissions)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: str, data, permissions: int = 0o644):
+    """Write ``data`` as JSON to ``path`` atomically."""
+    with atomic_open(path, permissions) as f:
+        json.dump(data, f, ensure_ascii=False)
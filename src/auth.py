@@ -1,16 +1,35 @@
 """
 Authentication module using Selenium for browser-based login.
 Handles 2FA by letting user log in manually, then extracts session cookies.
+Extracted cookies are saved to disk so later runs can skip the browser.
+
+Selenium is only imported when a browser is actually needed, so restoring
+a saved session (e.g. for the --api mode) stays cheap.
 """
-import time
-from typing import Optional
+import json
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 import requests
 
-from .config import LOGIN_URL, LOGIN_SUCCESS_INDICATOR, BROWSER_WAIT_TIMEOUT, BASE_URL
+from .atomic import write_json
+from .config import (
+    LOGIN_URL,
+    LOGIN_SUCCESS_INDICATOR,
+    BROWSER_WAIT_TIMEOUT,
+    BASE_URL,
+    SEMESTER_LIST_URL,
+    SESSION_FILE,
+    SESSION_PROBE_TIMEOUT,
+    PAGE_READY_TIMEOUT,
+    COOKIE_WAIT_TIMEOUT,
+)
+from .metrics import span
+from .transport import configure_transport
+
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 
 class WebLearningAuth:
@@ -18,35 +37,55 @@ class WebLearningAuth:
     Handles authentication to 网络学堂 using Selenium.
     Opens a browser for user to complete login (including 2FA),
     then extracts session cookies for API requests.
+    
+    After a successful login the cookies and CSRF token are saved to
+    ``session_file``; the next login() reuses them if they still work.
     """
     
-    def __init__(self):
-        self.driver: Optional[webdriver.Chrome] = None
+    def __init__(self, session_file: Optional[str] = SESSION_FILE):
+        """
+        Args:
+            session_file: Where to save/restore the session.
+                          None disables session persistence.
+        """
+        self.driver: Optional["webdriver.Chrome"] = None
         self.session: Optional[requests.Session] = None
         self.cookies: dict = {}
         self.csrf_token: str = ""
+        self.session_file = session_file
     
-    def _create_driver(self) -> webdriver.Chrome:
-        """Create and configure Chrome WebDriver."""
-        options = Options()
-        # Keep browser open after script completes for debugging
-        options.add_experimental_option('detach', False)
-        # Suppress unnecessary logging
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        # Disable automation flags to appear more like regular browser
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        
-        driver = webdriver.Chrome(options=options)
-        driver.set_window_size(1200, 800)
-        return driver
+    def _create_driver(self) -> "webdriver.Chrome":
+        """Create a visible Chrome WebDriver for the manual login."""
+        from .browser import create_driver
+        return create_driver(detach=False, window_size=(1200, 800))
     
-    def login(self) -> requests.Session:
+    def login(self, use_saved: bool = True) -> requests.Session:
         """
         Open browser for user to log in, wait for success, extract cookies.
         
+        If a saved session exists and still passes an authenticated probe,
+        it is returned directly and no browser is started.
+        
+        Args:
+            use_saved: Try the saved session before opening the browser
+        
         Returns:
             requests.Session with authentication cookies set
         """
+        with span('login'):
+            return self._login(use_saved)
+    
+    def _login(self, use_saved: bool) -> requests.Session:
+        """login() body, timed as the "login" span."""
+        if use_saved:
+            session = self.restore_session()
+            if session is not None:
+                return session
+        
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+        from .waits import wait_for, document_complete, cookies_present
+        
         print("🔐 Opening browser for login...")
         print("   Please log in to 网络学堂 (including 2FA if required)")
         print(f"   Waiting up to {BROWSER_WAIT_TIMEOUT} seconds...")
@@ -66,30 +105,119 @@ class WebLearningAuth:
             self.close()
             raise RuntimeError("Login failed - please try again") from e
         
-        # Give page time to fully load and set all cookies
-        time.sleep(3)
+        # Let the redirect chain finish before navigating away
+        try:
+            wait_for(self.driver, document_complete, PAGE_READY_TIMEOUT, "Landing page")
+        except TimeoutException as e:
+            print(f"   ⚠️ {e.msg}")
         
         # Navigate to ensure we get all cookies for the learning domain
         self.driver.get(f"{BASE_URL}/f/wlxt/index/course/student/")
-        time.sleep(2)
+        try:
+            wait_for(
+                self.driver,
+                cookies_present(['XSRF-TOKEN']),
+                COOKIE_WAIT_TIMEOUT,
+                "Session cookies",
+            )
+        except TimeoutException as e:
+            print(f"   ⚠️ {e.msg}")
         
         # Extract cookies from browser
         self._extract_cookies()
         
         # Create requests session with extracted cookies
         self.session = self._create_session()
+        self.save_session()
         
         # Close browser - we have what we need
         self.close()
         
         return self.session
     
-    def _extract_cookies(self):
+    def restore_session(self) -> Optional[requests.Session]:
+        """
+        Load the saved session and check that it is still authenticated.
+        
+        Returns:
+            requests.Session if the saved session works, otherwise None
+        """
+        if not self.session_file or not os.path.exists(self.session_file):
+            return None
+        
+        try:
+            with open(self.session_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️ Could not read saved session: {e}")
+            return None
+        
+        self.cookies = data.get('cookies', {})
+        self.csrf_token = data.get('csrf_token', '')
+        session = self._create_session()
+        
+        if not self._probe_session(session):
+            print("   Saved session has expired, logging in again")
+            return None
+        
+        print(f"✅ Restored saved session (from {data.get('saved_at', 'unknown')})")
+        self.session = session
+        return session
+    
+    def save_session(self):
+        """Save cookies and CSRF token so the next run can skip the browser."""
+        if not self.session_file or not self.cookies:
+            return
+        
+        data = {
+            'saved_at': datetime.now().isoformat(),
+            'cookies': self.cookies,
+            'csrf_token': self.csrf_token,
+        }
+        
+        # Written atomically so a crash never leaves a broken session, and
+        # kept private - these cookies are as good as a password
+        write_json(self.session_file, data, permissions=0o600)
+        
+        print(f"   Session saved to {self.session_file}")
+    
+    def session_valid(self, session: Optional[requests.Session] = None) -> bool:
+        """Whether ``session`` (default: the current one) is still logged in."""
+        session = session or self.session
+        return session is not None and self._probe_session(session)
+    
+    @staticmethod
+    def _probe_session(session: requests.Session) -> bool:
+        """Check a session with one cheap authenticated request."""
+        try:
+            response = session.get(
+                SEMESTER_LIST_URL,
+                timeout=SESSION_PROBE_TIMEOUT,
+                allow_redirects=False,
+            )
+            if response.status_code != 200:
+                return False
+            return response.json().get('result') == 'success'
+        except (requests.RequestException, ValueError):
+            return False
+    
+    def capture_session(self, driver: "webdriver.Chrome") -> requests.Session:
+        """
+        Take over the session of a browser that is already logged in
+        (e.g. the one main.py drives) and save it for later runs.
+        """
+        self._extract_cookies(driver)
+        self.session = self._create_session()
+        self.save_session()
+        return self.session
+    
+    def _extract_cookies(self, driver: Optional["webdriver.Chrome"] = None):
         """Extract all cookies from browser session."""
-        if not self.driver:
+        driver = driver or self.driver
+        if not driver:
             return
         
-        browser_cookies = self.driver.get_cookies()
+        browser_cookies = driver.get_cookies()
         self.cookies = {}
         
         for cookie in browser_cookies:
@@ -136,7 +264,8 @@ class WebLearningAuth:
         
         session.headers.update(headers)
         
-        return session
+        # Pool sized to the crawl concurrency, keep-alive and compression
+        return configure_transport(session)
     
     def close(self):
         """Close the browser if open."""
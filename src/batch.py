@@ -0,0 +1,181 @@
+"""
+Batch crawl for many accounts with stored sessions.
+Each account runs its own HomeworkCrawler in a separate process, and
+results are written to output/<account>/.
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .auth import WebLearningAuth
+from .cache import ResponseCache
+from .config import CACHE_DIR, OUTPUT_DIR, HTML_OUTPUT_FILE, JSON_OUTPUT_FILE
+from .crawler import HomeworkCrawler
+from .output import generate_html, generate_json
+from .store import HomeworkStore
+
+# Account names are used as directory names
+_SAFE_NAME = re.compile(r'[^\W.][\w.-]*')
+
+
+@dataclass
+class AccountResult:
+    """Outcome of crawling one account."""
+    name: str
+    homework_count: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    failed_lists: int = 0  # homework lists missing from an otherwise good crawl
+    
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def load_accounts(path: str) -> List[dict]:
+    """
+    Load the account list.
+    
+    The file is a JSON list of objects like:
+        {"name": "alice", "session_file": "sessions/alice.json",
+         "semester": "2024-2025-1"}
+    where "semester" is optional. Session files are created by a normal
+    login with WebLearningAuth(session_file=...).
+    
+    Names become directory names (output/<name>/, .cache/accounts/<name>/),
+    so they must be unique and made of letters, digits, "_", "-" and "."
+    (not starting with ".").
+    
+    Raises:
+        ValueError: If an entry is incomplete or a name is unsafe or repeated
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        accounts = json.load(f)
+    
+    seen = set()
+    for account in accounts:
+        if not account.get('name') or not account.get('session_file'):
+            raise ValueError(f"Account entry needs 'name' and 'session_file': {account}")
+        name = account['name']
+        if not isinstance(name, str) or not _SAFE_NAME.fullmatch(name):
+            raise ValueError(
+                f"Account name {name!r} is not usable as a directory name "
+                f"(letters, digits, '_', '-', '.'; not starting with '.')"
+            )
+        # Case-insensitive file systems would still merge "Alice" and "alice"
+        if name.casefold() in seen:
+            raise ValueError(f"Duplicate account name: {name!r}")
+        seen.add(name.casefold())
+    return accounts
+
+
+def crawl_account(
+    account: dict,
+    output_dir: str = OUTPUT_DIR,
+    store_path: Optional[str] = None,
+) -> AccountResult:
+    """Crawl one account, write its reports and optionally record history."""
+    name = account['name']
+    start = time.monotonic()
+    
+    try:
+        session = WebLearningAuth(session_file=account['session_file']).restore_session()
+        if session is None:
+            raise RuntimeError("saved session is missing or has expired")
+        
+        # Course lists differ per account, so each one gets its own cache
+        cache = ResponseCache(os.path.join(CACHE_DIR, 'accounts', name))
+        crawler = HomeworkCrawler(session, cache=cache)
+        homework_list = crawler.get_all_homework(account.get('semester'))
+        
+        account_dir = os.path.join(output_dir, name)
+        os.makedirs(account_dir, exist_ok=True)
+        generate_html(homework_list, os.path.join(account_dir, HTML_OUTPUT_FILE))
+        generate_json(
+            homework_list,
+            os.path.join(account_dir, JSON_OUTPUT_FILE),
+            failures=crawler.failures,
+        )
+        
+        if store_path:
+            # The course list comes from the cache filled by get_all_homework
+            with HomeworkStore(store_path) as store:
+                store.record_crawl(
+                    homework_list,
+                    crawler.get_courses(account.get('semester')),
+                    account=name,
+                )
+        
+        return AccountResult(
+            name,
+            len(homework_list),
+            time.monotonic() - start,
+            failed_lists=len(crawler.failures),
+        )
+    except Exception as e:
+        return AccountResult(name, seconds=time.monotonic() - start, error=str(e))
+
+
+def run_batch(
+    accounts: List[dict],
+    workers: Optional[int] = None,
+    output_dir: str = OUTPUT_DIR,
+    store_path: Optional[str] = None,
+) -> List[AccountResult]:
+    """
+    Crawl all accounts across a process pool.
+    
+    Args:
+        accounts: Entries from load_accounts()
+        workers: Number of processes (defaults to the number of CPU cores)
+        output_dir: Reports go to <output_dir>/<account name>/
+        store_path: SQLite history store to record every account into
+    
+    Returns:
+        One AccountResult per account, in input order
+    """
+    workers = min(workers or os.cpu_count() or 1, len(accounts)) or 1
+    print(f"👥 Crawling {len(accounts)} accounts with {workers} processes...")
+    
+    start = time.monotonic()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(crawl_account, account, output_dir, store_path): account['name']
+            for account in accounts
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:  # worker process died
+                results[name] = AccountResult(name, error=str(e))
+    
+    ordered = [results[account['name']] for account in accounts]
+    print_summary(ordered, time.monotonic() - start)
+    return ordered
+
+
+def print_summary(results: List[AccountResult], elapsed: float):
+    """Print throughput and failures of a batch run."""
+    succeeded = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+    homework_total = sum(r.homework_count for r in succeeded)
+    
+    print("\n" + "=" * 50)
+    print(f"📊 Batch finished in {elapsed:.1f}s")
+    print(f"   Accounts: {len(succeeded)} ok, {len(failed)} failed")
+    print(f"   Homework: {homework_total} items")
+    if elapsed > 0:
+        print(f"   Throughput: {len(results) / elapsed:.2f} accounts/s, "
+              f"{homework_total / elapsed:.1f} items/s")
+    for r in failed:
+        print(f"   ❌ {r.name}: {r.error}")
+    for r in succeeded:
+        if r.failed_lists:
+            print(f"   ⚠️ {r.name}: {r.failed_lists} homework lists could not be fetched")
+    print("=" * 50)
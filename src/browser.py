@@ -0,0 +1,216 @@
+"""
+Chrome WebDriver creation and a pool of reusable (headless) drivers.
+Drivers in the pool are started once, health-checked on every checkout,
+and recycled after a number of uses or when they stop responding.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .config import BASE_URL, DRIVER_POOL_SIZE, DRIVER_MAX_USES, DRIVER_CHECKOUT_TIMEOUT
+
+
+def create_driver(
+    headless: bool = False,
+    detach: bool = False,
+    window_size: Tuple[int, int] = (1200, 900),
+) -> webdriver.Chrome:
+    """
+    Create and configure Chrome WebDriver.
+    
+    Args:
+        headless: Run without a visible window
+        detach: Keep the browser open after the script exits
+        window_size: (width, height) of the browser window
+    """
+    options = Options()
+    options.add_experimental_option('detach', detach)
+    # Suppress unnecessary logging
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    # Disable automation flags to appear more like regular browser
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-dev-shm-usage')
+    
+    driver = webdriver.Chrome(options=options)
+    if not headless:
+        driver.set_window_size(*window_size)
+    return driver
+
+
+def restore_cookies(driver: webdriver.Chrome, cookies: dict):
+    """Load saved session cookies into a driver for the learning domain."""
+    # Cookies can only be added for the domain that is currently open
+    driver.get(f"{BASE_URL}/")
+    for name, value in cookies.items():
+        driver.add_cookie({'name': name, 'value': value})
+
+
+def is_healthy(driver: webdriver.Chrome) -> bool:
+    """Check that a driver still responds to commands."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+class _PooledDriver:
+    """A driver plus the number of times it has been checked out."""
+    
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Pool of warm Chrome drivers that can be checked out for scraping.
+    
+    Usage:
+        with DriverPool(cookies=auth.cookies) as pool:
+            with pool.checkout() as driver:
+                driver.get(url)
+    
+    acquire() and release() do the same for a driver held across calls.
+    """
+    
+    def __init__(
+        self,
+        size: int = DRIVER_POOL_SIZE,
+        max_uses: int = DRIVER_MAX_USES,
+        headless: bool = True,
+        cookies: Optional[dict] = None,
+    ):
+        """
+        Args:
+            size: Maximum number of drivers alive at once
+            max_uses: Checkouts after which a driver is replaced
+            headless: Start drivers without a visible window
+            cookies: Session cookies restored into every new driver
+        """
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self.cookies = cookies or {}
+        self._idle: "queue.Queue[_PooledDriver]" = queue.Queue()
+        self._checked_out: Dict[int, _PooledDriver] = {}
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _new_driver(self) -> _PooledDriver:
+        """Start a driver and restore the session into it."""
+        driver = create_driver(headless=self.headless)
+        if self.cookies:
+            restore_cookies(driver, self.cookies)
+        return _PooledDriver(driver)
+    
+    def _start_in_slot(self) -> _PooledDriver:
+        """Start a driver in an already reserved slot, freeing it on failure."""
+        try:
+            return self._new_driver()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+    
+    def warm(self):
+        """Start all drivers up front so the first checkouts are instant."""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._idle.put(self._start_in_slot())
+    
+    def _acquire(self) -> _PooledDriver:
+        """Take an idle driver, starting a new one if the pool is not full."""
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                pooled = self._start_in_slot()
+            else:
+                try:
+                    pooled = self._idle.get(timeout=DRIVER_CHECKOUT_TIMEOUT)
+                except queue.Empty:
+                    raise RuntimeError(
+                        f"no pooled driver became free within {DRIVER_CHECKOUT_TIMEOUT}s"
+                    ) from None
+        
+        if not is_healthy(pooled.driver):
+            # The replacement takes over the dead driver's slot
+            self._quit(pooled)
+            pooled = self._start_in_slot()
+        return pooled
+    
+    def _release(self, pooled: _PooledDriver, broken: bool):
+        """Return a driver to the pool, recycling it if worn out or broken."""
+        pooled.uses += 1
+        if broken or pooled.uses >= self.max_uses:
+            self._quit(pooled)
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(pooled)
+    
+    def acquire(self) -> webdriver.Chrome:
+        """Check out a driver until release() is called with it."""
+        pooled = self._acquire()
+        with self._lock:
+            self._checked_out[id(pooled.driver)] = pooled
+        return pooled.driver
+    
+    def release(self, driver: webdriver.Chrome, broken: bool = False):
+        """Return a driver from acquire(); ``broken`` ones are replaced."""
+        with self._lock:
+            pooled = self._checked_out.pop(id(driver))
+        self._release(pooled, broken)
+    
+    @contextmanager
+    def checkout(self) -> Iterator[webdriver.Chrome]:
+        """Check out a driver for the duration of a ``with`` block."""
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = not is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken)
+    
+    @staticmethod
+    def _quit(pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+    
+    def close(self):
+        """Quit all idle drivers."""
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(pooled)
+            with self._lock:
+                self._created -= 1
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,178 @@
+"""
+On-disk caches for 网络学堂 data.
+
+ResponseCache holds API responses whose data rarely changes (semester
+list, course list), keyed by endpoint and form parameters, with a
+per-endpoint TTL. DetailCache holds parsed assignment pages, keyed by
+zyid and a hash of the homework's list row, so a page is fetched again
+only when its list entry changed.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from .atomic import write_json
+from .config import (
+    CACHE_DIR,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTLS,
+    DETAIL_CACHE_DIR,
+    DETAIL_CACHE_MAX_ENTRIES,
+)
+
+
+class ResponseCache:
+    """
+    Stores JSON responses as files under ``cache_dir``.
+    Only endpoints with a TTL are cached; the least recently used
+    entries are evicted once more than ``max_entries`` are stored.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        ttls: Optional[Dict[str, int]] = None,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        self.cache_dir = cache_dir
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+    
+    def _path(self, url: str, params: Optional[dict]) -> str:
+        """Build the file path for an endpoint + parameters pair."""
+        key_source = json.dumps([url, sorted((params or {}).items())], default=str)
+        key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, url: str, params: Optional[dict] = None) -> Optional[dict]:
+        """Return the cached response, or None if missing or expired."""
+        ttl = self.ttls.get(url)
+        if not ttl:
+            return None
+        
+        path = self._path(url, params)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get('stored_at', 0) > ttl:
+            return None
+        
+        # Touch the file so eviction drops the least recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('data')
+    
+    def set(self, url: str, params: Optional[dict], data: dict):
+        """Store a response if the endpoint is cacheable."""
+        if not self.ttls.get(url):
+            return
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_json(
+            self._path(url, params),
+            {'stored_at': time.time(), 'url': url, 'data': data},
+        )
+        _evict(self.cache_dir, self.max_entries)
+    
+    def clear(self):
+        """Remove all cached responses."""
+        for path in _entries(self.cache_dir):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def content_hash(data: dict) -> str:
+    """Stable hash of a JSON-serializable dict (key order does not matter)."""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class DetailCache:
+    """
+    Stores parsed assignment pages as ``<zyid>.json`` under ``cache_dir``.
+    
+    Each entry remembers the content hash it was fetched for; a lookup
+    with a different hash (the list row changed: new deadline, grade,
+    edited text...) is a miss. Entries never expire otherwise.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = DETAIL_CACHE_DIR,
+        max_entries: int = DETAIL_CACHE_MAX_ENTRIES,
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+    
+    def _path(self, zyid: str) -> str:
+        # zyid is a hex-like id, but never trust it as a file name
+        key = hashlib.sha1(zyid.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, zyid: str, digest: str) -> Optional[dict]:
+        """Return the cached detail for ``zyid`` if it was stored for ``digest``."""
+        path = self._path(zyid)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if entry.get('hash') != digest:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('data')
+    
+    def set(self, zyid: str, digest: str, data: dict):
+        """Store the detail for ``zyid``, replacing any older version."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_json(self._path(zyid), {'zyid': zyid, 'hash': digest, 'data': data})
+    
+    def prune(self):
+        """Drop the least recently used entries beyond max_entries."""
+        _evict(self.cache_dir, self.max_entries)
+    
+    def clear(self):
+        """Remove all cached details."""
+        for path in _entries(self.cache_dir):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _entries(cache_dir: str) -> list:
+    """List paths of all cache entries in ``cache_dir``."""
+    if not os.path.isdir(cache_dir):
+        return []
+    return [
+        os.path.join(cache_dir, name)
+        for name in os.listdir(cache_dir)
+        if name.endswith('.json')
+    ]
+
+
+def _evict(cache_dir: str, max_entries: int):
+    """Drop the least recently used entries beyond max_entries."""
+    entries = _entries(cache_dir)
+    if len(entries) <= max_entries:
+        return
+    
+    entries.sort(key=lambda p: os.path.getmtime(p))
+    for path in entries[:len(entries) - max_entries]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
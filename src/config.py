@@ -1,11 +1,13 @@
 """
 Configuration constants for the 网络学堂 homework crawler.
 """
+import os
 
 # URLs
 # The ID auth page handles 2FA login
 LOGIN_URL = "https://id.tsinghua.edu.cn/do/off/ui/auth/login/form/bb5df85216504820be7bba2b0ae1535b/0"
-BASE_URL = "https://learn.tsinghua.edu.cn"
+# WLXT_BASE_URL points the crawler at another server (e.g. benchmarks/mock_server.py)
+BASE_URL = os.environ.get("WLXT_BASE_URL", "https://learn.tsinghua.edu.cn").rstrip("/")
 
 # API Endpoints
 API_PREFIX = f"{BASE_URL}/b"
@@ -13,12 +15,90 @@ SEMESTER_LIST_URL = f"{API_PREFIX}/wlxt/kc/v_wlkc_xs_xkb_kcb_extend/student/load
 COURSE_LIST_URL = f"{API_PREFIX}/wlxt/kc/v_wlkc_xs_xkb_kcb_extend/student/loadCourseBySemesterId"
 HOMEWORK_LIST_URL = f"{API_PREFIX}/wlxt/kczy/zy/student/index/zyListWj"  # Unsubmitted homework
 HOMEWORK_SUBMITTED_URL = f"{API_PREFIX}/wlxt/kczy/zy/student/index/zyListYjwg"  # Submitted homework
+HOMEWORK_GRADED_URL = f"{API_PREFIX}/wlxt/kczy/zy/student/index/zyListYpg"  # Graded homework
+# Assignment page (HTML): instructions, attachments, grading feedback
+HOMEWORK_DETAIL_URL = f"{BASE_URL}/f/wlxt/kczy/zy/student/viewCj"
+COURSE_FILE_LIST_URL = f"{API_PREFIX}/wlxt/kj/wlkc_kjxxb/student/kjxxbByWlkcidAndSizeForStudent"
+COURSE_FILE_DOWNLOAD_URL = f"{API_PREFIX}/wlxt/kj/wlkc_kjxxb/student/downloadFile"
+
+# Crawl settings
+MAX_CONCURRENT_REQUESTS = 8  # courses fetched in parallel by HomeworkCrawler
+HOMEWORK_PAGE_SIZE = 100  # rows requested per homework list page
+HOMEWORK_MAX_PAGES = 50  # safety cap per list, in case the server ignores "page"
+DEADLINE_CACHE_SIZE = 4096  # memoized deadline strings
+
+# HTTP transport: every course fetches 3 homework lists at once
+HTTP_POOL_SIZE = MAX_CONCURRENT_REQUESTS * 3  # keep-alive connections per host
+HTTP2_ENABLED = False  # needs: pip install 'httpx[http2]'
+
+# Request policy (timeouts, retries, circuit breaker)
+REQUEST_TIMEOUT = (5, 20)  # seconds: (connect, read)
+REQUEST_MAX_RETRIES = 3  # retries for idempotent requests
+REQUEST_BACKOFF_BASE = 0.5  # seconds, doubled after every retry
+REQUEST_BACKOFF_MAX = 8  # seconds, cap for a single backoff
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+BREAKER_RESET_TIMEOUT = 30  # seconds before a trial request is let through
+
+# Response cache for rarely-changing endpoints
+CACHE_DIR = ".cache"
+CACHE_MAX_ENTRIES = 64  # oldest entries are evicted beyond this
+CACHE_TTLS = {  # seconds; endpoints not listed here are never cached
+    SEMESTER_LIST_URL: 7 * 24 * 3600,
+    COURSE_LIST_URL: 24 * 3600,
+}
+
+# Homework detail cache (parsed assignment pages)
+DETAIL_CACHE_DIR = ".cache/details"  # keyed by zyid + hash of the list row
+DETAIL_CACHE_MAX_ENTRIES = 2000  # least recently used pages are evicted beyond this
+
+# Incremental crawl snapshot (per-course homework from the previous run)
+SNAPSHOT_FILE = ".cache/snapshot/snapshot.json"  # own directory: ResponseCache.clear() empties .cache/*.json
+SNAPSHOT_MAX_AGE = 24 * 3600  # seconds before every course is refetched anyway
+
+# HTML parsing backend for the Selenium flow: None picks lxml if installed,
+# otherwise Python's built-in "html.parser"
+HTML_PARSER = None
+
+# Watch mode: poll interval (seconds) by the most urgent open homework
+WATCH_INTERVALS = {
+    1: 5 * 60,    # something due within 24 hours
+    2: 15 * 60,   # within 3 days
+    3: 60 * 60,   # within 7 days
+}
+WATCH_INTERVAL_DEFAULT = 3 * 3600  # nothing due within a week
+WATCH_RETRY_INTERVAL = 60  # after a failed poll
 
 # Browser settings
 BROWSER_WAIT_TIMEOUT = 300  # seconds to wait for user login
 LOGIN_SUCCESS_INDICATOR = "/f/wlxt/index/course/student"
+PAGE_READY_TIMEOUT = 20  # seconds for a page's content to appear
+COOKIE_WAIT_TIMEOUT = 10  # seconds for session cookies to be set after login
+XHR_SCRIPT_TIMEOUT = 60  # seconds for the in-browser homework fetch (--xhr)
+DRIVER_POOL_SIZE = 4  # headless drivers scraping in parallel (--headless)
+DRIVER_MAX_USES = 50  # checkouts before a pooled driver is restarted
+DRIVER_CHECKOUT_TIMEOUT = 120  # seconds to wait for a busy pool before giving up
+
+# Session persistence
+SESSION_FILE = ".wlxt_session.json"  # saved cookies + XSRF token (keep private!)
+SESSION_PROBE_TIMEOUT = 5  # seconds for the saved-session check request
 
 # Output settings
 OUTPUT_DIR = "output"
 HTML_OUTPUT_FILE = "homework.html"
 JSON_OUTPUT_FILE = "homework.json"
+NDJSON_OUTPUT_FILE = "homework.ndjson"
+STORE_FILE = "homework_history.db"  # SQLite history of every crawl (--store)
+METRICS_TRACE_FILE = "metrics_trace.json"  # Chrome trace of the crawl phases (--metrics)
+METRICS_PROM_FILE = "wlxt.prom"  # Prometheus textfile (--metrics)
+METRICS_MAX_SPANS = 10000  # most recent spans kept in memory
+PROFILE_DIR = "profile"  # --profile results, inside OUTPUT_DIR
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_TOP_N = 40  # functions listed per phase in the text stats
+
+# Attachment downloads (--download)
+DOWNLOAD_DIR = "downloads"  # files land in downloads/<course>/...
+DOWNLOAD_OBJECTS_DIR = ".objects"  # content store inside DOWNLOAD_DIR, by sha256
+DOWNLOAD_WORKERS = 6  # files downloaded in parallel
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # bytes per read; files are never held in memory
+DOWNLOAD_RETRIES = 3  # resumed attempts after a broken transfer
+COURSE_FILE_PAGE_SIZE = 500  # course files listed per request
@@ -1,8 +1,11 @@
 """
 Crawler module for fetching courses and homework from 网络学堂.
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from datetime import datetime
-from typing import List, Optional
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
 import requests
 
 from .config import (
@@ -10,25 +13,113 @@ from .config import (
     COURSE_LIST_URL,
     HOMEWORK_LIST_URL,
     HOMEWORK_SUBMITTED_URL,
+    HOMEWORK_GRADED_URL,
+    HOMEWORK_DETAIL_URL,
+    COURSE_FILE_LIST_URL,
+    COURSE_FILE_DOWNLOAD_URL,
     BASE_URL,
+    MAX_CONCURRENT_REQUESTS,
+    HOMEWORK_PAGE_SIZE,
+    HOMEWORK_MAX_PAGES,
+    COURSE_FILE_PAGE_SIZE,
 )
-from .models import Course, Homework
+from .cache import DetailCache, ResponseCache, content_hash
+from .deadline import parse_deadline, format_deadline
+from .metrics import span
+from .models import (
+    Attachment,
+    Clock,
+    Course,
+    CourseFile,
+    FetchFailure,
+    Homework,
+    HomeworkDetail,
+    format_time_left,
+)
+from .policy import RequestPolicy
+
+# Homework list endpoints and the status they imply. Later entries win
+# when the same zyid shows up twice (a graded item is also submitted).
+HOMEWORK_ENDPOINTS = (
+    (HOMEWORK_LIST_URL, "unsubmitted"),
+    (HOMEWORK_SUBMITTED_URL, "submitted"),
+    (HOMEWORK_GRADED_URL, "graded"),
+)
+
+_FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'}
+
+
+class CrawlError(RuntimeError):
+    """Raised when a crawl cannot produce a meaningful result (e.g. no course list)."""
 
 
 class HomeworkCrawler:
     """
     Fetches courses and homework assignments from 网络学堂 APIs.
+    
+    Homework lists that fail (after retries) are recorded in ``failures``
+    for the latest crawl instead of silently turning into empty lists.
+    
+    Homework details (assignment page) are fetched lazily, the first time
+    ``body``, ``attachments`` or ``feedback`` is read, and kept in
+    ``detail_cache`` until the item's list row changes.
     """
     
-    def __init__(self, session: requests.Session):
+    def __init__(
+        self,
+        session: requests.Session,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        cache: Optional[ResponseCache] = None,
+        refresh: bool = False,
+        policy: Optional[RequestPolicy] = None,
+        detail_cache: Optional[DetailCache] = None,
+    ):
+        """
+        Args:
+            session: Authenticated requests.Session
+            max_workers: Maximum number of courses fetched concurrently.
+                         Use 1 to fetch courses one after another.
+            cache: Optional cache for the semester and course-list endpoints
+            refresh: Ignore cached responses (fresh ones are still stored)
+            policy: Timeouts, retries and circuit breaker for all requests
+            detail_cache: Cache for assignment pages (None: always fetch)
+        """
         self.session = session
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.refresh = refresh
+        self.policy = policy or RequestPolicy()
+        self.detail_cache = detail_cache
+        self.failures: List[FetchFailure] = []
+    
+    def _request_json(self, url: str, data: Optional[dict] = None) -> dict:
+        """
+        GET (no data) or POST (form data) an endpoint and return its JSON,
+        going through the response cache when one is configured.
+        """
+        if self.cache and not self.refresh:
+            cached = self.cache.get(url, data)
+            if cached is not None:
+                return cached
+        
+        if data is None:
+            response = self.policy.request(self.session, 'GET', url)
+        else:
+            response = self.policy.request(
+                self.session, 'POST', url, data=data, headers=_FORM_HEADERS
+            )
+        payload = response.json()
+        
+        # Only cache good answers - an error page must not stick for a week
+        if self.cache and payload.get('result') == 'success':
+            self.cache.set(url, data, payload)
+        return payload
     
     def get_current_semester(self) -> str:
         """Get the current semester ID."""
         try:
-            response = self.session.get(SEMESTER_LIST_URL)
-            response.raise_for_status()
-            data = response.json()
+            with span('semester'):
+                data = self._request_json(SEMESTER_LIST_URL)
             
             if data.get('result') == 'success' and data.get('resultList'):
                 # First item is usually the current semester
@@ -67,6 +158,9 @@ class HomeworkCrawler:
         
         Returns:
             List of Course objects
+        
+        Raises:
+            CrawlError: If the course list cannot be fetched
         """
         if semester_id is None:
             semester_id = self.get_current_semester()
@@ -75,13 +169,8 @@ class HomeworkCrawler:
         
         try:
             # Use form data for POST request
-            response = self.session.post(
-                COURSE_LIST_URL,
-                data={'semester': semester_id},
-                headers={'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'}
-            )
-            response.raise_for_status()
-            data = response.json()
+            with span('courses', semester=semester_id):
+                data = self._request_json(COURSE_LIST_URL, {'semester': semester_id})
             
             courses = []
             if data.get('result') == 'success' and data.get('resultList'):
@@ -101,31 +190,39 @@ class HomeworkCrawler:
         except requests.exceptions.HTTPError as e:
             print(f"❌ Failed to fetch courses (HTTP {e.response.status_code}): {e}")
             # Debug: Print response content
-            if e.response:
+            if e.response is not None:
                 print(f"   Response: {e.response.text[:200]}...")
-            return []
+            raise CrawlError(f"Failed to fetch courses: {e}") from e
         except Exception as e:
             print(f"❌ Failed to fetch courses: {e}")
-            return []
+            raise CrawlError(f"Failed to fetch courses: {e}") from e
     
     def get_homework(self, course: Course) -> List[Homework]:
         """
         Fetch homework assignments for a specific course.
         
+        The unsubmitted, submitted and graded lists are requested
+        concurrently and merged by homework id (zyid).
+        
         Args:
             course: Course object
         
         Returns:
             List of Homework objects
         """
-        homework_list = []
-        
-        # Fetch unsubmitted homework
-        homework_list.extend(
-            self._fetch_homework_list(course, HOMEWORK_LIST_URL, "unsubmitted")
-        )
+        with span('course_homework', course=course.name), \
+                ThreadPoolExecutor(max_workers=len(HOMEWORK_ENDPOINTS)) as executor:
+            results = executor.map(
+                lambda endpoint: self._fetch_homework_list(course, *endpoint),
+                HOMEWORK_ENDPOINTS,
+            )
+            
+            merged = {}
+            for homework_list in results:
+                for hw in homework_list:
+                    merged[hw.id or id(hw)] = hw
         
-        return homework_list
+        return list(merged.values())
     
     def _fetch_homework_list(
         self, 
@@ -133,107 +230,333 @@ class HomeworkCrawler:
         url: str, 
         status: str
     ) -> List[Homework]:
-        """Fetch homework from a specific API endpoint."""
+        """
+        Fetch homework from a specific API endpoint.
+        A failure is recorded in ``self.failures`` and yields no items.
+        """
         try:
-            response = self.session.post(
-                url,
-                data={
-                    'wlkcid': course.id,
-                    'size': 100,  # Get up to 100 items
-                    'page': 1,
-                },
-                headers={'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            homework_list = []
-            
-            # Handle the nested object structure
-            result_data = data.get('object', {})
-            if isinstance(result_data, dict):
-                rows = result_data.get('aaData', [])
-            else:
-                rows = []
-            
-            for item in rows:
-                deadline_str = item.get('jzsj', '')
-                deadline = self._parse_deadline(deadline_str)
-                
-                # Calculate time left
-                time_left = ""
-                if deadline:
-                    diff = deadline - datetime.now()
-                    if diff.total_seconds() < 0:
-                        time_left = "已过期"
-                    elif diff.days > 0:
-                        time_left = f"{diff.days}天"
-                    else:
-                        hours = int(diff.total_seconds() // 3600)
-                        time_left = f"{hours}小时"
-                
-                hw = Homework(
-                    id=item.get('zyid', ''),
-                    title=item.get('bt', 'Untitled'),
-                    course_name=course.name,
-                    course_id=course.id,
-                    deadline=deadline,
-                    deadline_str=deadline_str,
-                    status=status,
-                    time_left=time_left,
-                    description=item.get('sm', ''),
-                )
-                homework_list.append(hw)
-            
-            return homework_list
-            
+            return list(self.iter_homework(course, url, status))
         except Exception as e:
             print(f"   ⚠️ Failed to fetch {status} homework for {course.name}: {e}")
+            self.failures.append(FetchFailure(course.id, course.name, status, str(e)))
             return []
     
-    def _parse_deadline(self, deadline_str: str) -> Optional[datetime]:
-        """Parse deadline string into datetime object."""
-        if not deadline_str:
-            return None
+    def iter_homework(
+        self,
+        course: Course,
+        url: str,
+        status: str
+    ) -> Iterator[Homework]:
+        """
+        Stream homework from a specific API endpoint, page by page.
         
-        # Try common date formats
-        formats = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%d",
-        ]
+        Page N+1 is requested in the background while page N is being
+        parsed. Iteration stops as soon as the total reported by the
+        server has been seen, a short page comes back, a page repeats the
+        previous one, or HOMEWORK_MAX_PAGES pages have been read.
         
-        for fmt in formats:
-            try:
-                return datetime.strptime(deadline_str, fmt)
-            except ValueError:
+        Args:
+            course: Course object
+            url: Homework list endpoint
+            status: Status assigned to every yielded Homework
+        
+        Yields:
+            Homework objects in server order
+        """
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 1
+            pending = prefetcher.submit(self._fetch_homework_page, course, url, page)
+            seen = 0
+            first_id = None
+            
+            while pending is not None:
+                rows, total = pending.result()
+                # A server that ignores "page" sends the previous page again
+                if page > 1 and rows and rows[0].get('zyid') == first_id:
+                    break
+                first_id = rows[0].get('zyid') if rows else None
+                seen += len(rows)
+                
+                has_more = (
+                    len(rows) >= HOMEWORK_PAGE_SIZE
+                    and (total is None or seen < total)
+                )
+                if has_more and page >= HOMEWORK_MAX_PAGES:
+                    print(f"   ⚠️ {course.name}: stopped after {page} pages of {status} homework")
+                    has_more = False
+                page += 1
+                pending = (
+                    prefetcher.submit(self._fetch_homework_page, course, url, page)
+                    if has_more else None
+                )
+                
+                with span('parse', course=course.name, status=status, rows=len(rows)):
+                    parsed = []
+                    for item in rows:
+                        hw = self.parse_homework_item(item, course, status)
+                        # Nothing is requested until a detail field is read
+                        hw.detail_loader = partial(self.get_homework_detail, course.id, item)
+                        parsed.append(hw)
+                yield from parsed
+    
+    def _fetch_homework_page(
+        self,
+        course: Course,
+        url: str,
+        page: int
+    ) -> Tuple[list, Optional[int]]:
+        """
+        Fetch one page of a homework list.
+        
+        Returns:
+            (rows, total) where total is the row count reported by the
+            server, or None if the payload does not include it
+        """
+        response = self.policy.request(
+            self.session,
+            'POST',
+            url,
+            data={
+                'wlkcid': course.id,
+                'size': HOMEWORK_PAGE_SIZE,
+                'page': page,
+            },
+            headers=_FORM_HEADERS,
+        )
+        data = response.json()
+        
+        # Handle the nested object structure
+        result_data = data.get('object', {})
+        if not isinstance(result_data, dict):
+            return [], None
+        
+        rows = result_data.get('aaData') or []
+        total = result_data.get('iTotalRecords')
+        try:
+            total = int(total) if total is not None else None
+        except (TypeError, ValueError):
+            total = None
+        
+        return rows, total
+    
+    @staticmethod
+    def parse_homework_item(item: dict, course: Course, status: str) -> Homework:
+        """Build a Homework object from one row of an aaData payload."""
+        raw_deadline = item.get('jzsj', '')
+        deadline = parse_deadline(raw_deadline)
+        # jzsj may be epoch milliseconds; keep a readable string either way
+        if isinstance(raw_deadline, str):
+            deadline_str = raw_deadline
+        else:
+            deadline_str = format_deadline(deadline)
+        
+        return Homework(
+            id=item.get('zyid', ''),
+            title=item.get('bt', 'Untitled'),
+            course_name=course.name,
+            course_id=course.id,
+            deadline=deadline,
+            deadline_str=deadline_str,
+            status=status,
+            time_left=format_time_left(deadline),
+            description=item.get('sm', ''),
+        )
+    
+    def get_course_files(self, course: Course) -> List[CourseFile]:
+        """
+        List the files published in a course's 课件 section.
+        
+        Raises:
+            requests.RequestException: If the list cannot be fetched
+        """
+        response = self.policy.request(
+            self.session,
+            'GET',
+            COURSE_FILE_LIST_URL,
+            params={'wlkcid': course.id, 'size': COURSE_FILE_PAGE_SIZE},
+        )
+        data = response.json()
+        
+        # "object" is the file list itself, or a DataTables dict around it
+        rows = data.get('object') or []
+        if isinstance(rows, dict):
+            rows = rows.get('aaData') or []
+        
+        files = []
+        for item in rows:
+            file_id = item.get('wjid', '')
+            if not file_id:
                 continue
+            try:
+                size = int(item.get('wjdx') or 0)
+            except (TypeError, ValueError):
+                size = 0
+            files.append(CourseFile(
+                id=file_id,
+                course_id=course.id,
+                course_name=course.name,
+                title=item.get('bt', file_id),
+                file_type=item.get('wjlx', ''),
+                size=size,
+                url=f"{COURSE_FILE_DOWNLOAD_URL}?sfgk=0&wjid={file_id}",
+            ))
+        return files
+    
+    def get_all_course_files(self, courses: List[Course]) -> List[CourseFile]:
+        """
+        List the files of several courses concurrently. A course whose
+        list fails is reported, recorded in ``self.failures`` (status
+        "files") and skipped.
+        """
+        def fetch(course: Course) -> List[CourseFile]:
+            try:
+                return self.get_course_files(course)
+            except Exception as e:
+                print(f"   ⚠️ Failed to list files for {course.name}: {e}")
+                self.failures.append(FetchFailure(course.id, course.name, 'files', str(e)))
+                return []
         
-        return None
+        workers = min(self.max_workers, len(courses)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [f for files in executor.map(fetch, courses) for f in files]
     
-    def get_all_homework(self, semester_id: Optional[str] = None) -> List[Homework]:
+    def get_homework_detail(self, course_id: str, item: dict) -> HomeworkDetail:
         """
-        Fetch all homework from all courses in a semester.
+        Fetch and parse the assignment page for one aaData row.
+        
+        The cache key is the row's zyid plus a hash of the whole row, so
+        a changed deadline, grade or text fetches the page again.
+        """
+        zyid = item.get('zyid', '')
+        digest = content_hash(item)
+        
+        if self.detail_cache and zyid:
+            cached = self.detail_cache.get(zyid, digest)
+            if cached is not None:
+                return _detail_from_dict(cached)
+        
+        from .parsing import parse_homework_detail
+        
+        with span('detail', zyid=zyid):
+            response = self.policy.request(
+                self.session,
+                'GET',
+                HOMEWORK_DETAIL_URL,
+                params={
+                    'wlkcid': course_id,
+                    'zyid': zyid,
+                    'xszyid': item.get('xszyid', ''),
+                },
+            )
+            detail = parse_homework_detail(response.text)
+        
+        if self.detail_cache and zyid:
+            self.detail_cache.set(zyid, digest, asdict(detail))
+        return detail
+    
+    def load_details(self, homework_list: Iterable[Homework]) -> int:
+        """
+        Load the details of many homework items concurrently (e.g. before
+        rendering a report that shows them). Failures are kept on the item
+        (``detail_error``), added to ``failures`` and reported, not raised.
+        
+        Returns:
+            Number of items whose details could not be loaded
+        """
+        pending = [hw for hw in homework_list if not hw.detail_loaded]
+        if not pending:
+            return 0
+        
+        def load(hw: Homework) -> bool:
+            hw.detail  # first access loads and keeps it
+            return hw.detail_error is None
+        
+        print(f"📎 Loading details for {len(pending)} homework items...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(load, pending))
+        
+        failed = 0
+        for hw, ok in zip(pending, results):
+            if not ok:
+                failed += 1
+                print(f"   ⚠️ Failed to load details for {hw.title} ({hw.course_name}): "
+                      f"{hw.detail_error}")
+                self.failures.append(
+                    FetchFailure(hw.course_id, hw.course_name, 'detail', hw.detail_error)
+                )
+        
+        if self.detail_cache:
+            self.detail_cache.prune()
+        return failed
+    
+    def iter_all_homework(self, semester_id: Optional[str] = None) -> Iterator[Homework]:
+        """
+        Yield homework from all courses in a semester as each course finishes.
+        
+        Unlike get_all_homework() the items are not sorted, so the first
+        ones are available before the slowest course has answered. Pass
+        the collected items to finish_crawl() for the sorted list.
         
         Args:
             semester_id: Semester ID. If None, uses current semester.
         
-        Returns:
-            List of all Homework objects, sorted by deadline
+        Yields:
+            Homework objects, course by course in completion order
+        
+        Raises:
+            CrawlError: If the course list cannot be fetched
         """
+        self.failures = []
         courses = self.get_courses(semester_id)
-        all_homework = []
         
         print("📝 Fetching homework from each course...")
         for course in courses:
             print(f"   → {course.name}")
-            homework = self.get_homework(course)
-            all_homework.extend(homework)
         
-        # Sort by deadline (None/expired at the end)
-        all_homework.sort(
-            key=lambda h: (h.deadline is None, h.is_expired, h.deadline or datetime.max)
-        )
+        # Failures are already isolated per course by _fetch_homework_list,
+        # so one slow or broken course never blocks the others.
+        workers = min(self.max_workers, len(courses)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.get_homework, course) for course in courses]
+            for future in as_completed(futures):
+                yield from future.result()
+    
+    def get_all_homework(self, semester_id: Optional[str] = None) -> List[Homework]:
+        """
+        Fetch all homework from all courses in a semester.
+        
+        Args:
+            semester_id: Semester ID. If None, uses current semester.
+        
+        Returns:
+            List of all Homework objects, sorted by deadline.
+            Lists that could not be fetched are in ``self.failures``.
+        
+        Raises:
+            CrawlError: If the course list cannot be fetched
+        """
+        return self.finish_crawl(list(self.iter_all_homework(semester_id)))
+    
+    def finish_crawl(self, all_homework: List[Homework]) -> List[Homework]:
+        """
+        Sort a crawl's homework by deadline (None/expired at the end)
+        and report the total and any failed lists.
+        """
+        clock = Clock()
+        all_homework.sort(key=lambda h: h.sort_key(clock))
         
         print(f"\n✅ Found {len(all_homework)} homework assignments total")
+        if self.failures:
+            print(f"⚠️ {len(self.failures)} homework lists could not be fetched:")
+            for failure in self.failures:
+                print(f"   • {failure}")
         return all_homework
+
+
+def _detail_from_dict(data: dict) -> HomeworkDetail:
+    """Rebuild a HomeworkDetail stored by DetailCache."""
+    return HomeworkDetail(
+        body=data.get('body', ''),
+        attachments=[Attachment(**a) for a in data.get('attachments', [])],
+        feedback=data.get('feedback', ''),
+    )
@@ -0,0 +1,86 @@
+"""
+Deadline parsing shared by the API crawler and the Selenium scraper.
+
+The known shapes (YYYY-MM-DD, YYYY-MM-DD HH:MM, YYYY-MM-DD HH:MM:SS and
+epoch milliseconds) are handled by a hand-written fast path; anything else
+falls back to strptime. Results are memoized, since the same deadline
+strings repeat heavily across courses and runs.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+from .config import DEADLINE_CACHE_SIZE
+
+_FALLBACK_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+)
+
+
+def parse_deadline(value: Union[str, int, float, None]) -> Optional[datetime]:
+    """
+    Parse a deadline into a datetime.
+    
+    Args:
+        value: A date string like "2024-12-31 23:59", or epoch milliseconds
+               (as a number or a digit string)
+    
+    Returns:
+        Naive local datetime, or None if the value cannot be parsed
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return _from_epoch_ms(value)
+    if isinstance(value, str):
+        return _parse_text(value.strip())
+    return None
+
+
+def format_deadline(deadline: Optional[datetime]) -> str:
+    """Format a deadline the way 网络学堂 displays it."""
+    return deadline.strftime("%Y-%m-%d %H:%M") if deadline else ""
+
+
+def _from_epoch_ms(value: float) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(value / 1000)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=DEADLINE_CACHE_SIZE)
+def _parse_text(text: str) -> Optional[datetime]:
+    """Parse a stripped deadline string (memoized)."""
+    if not text:
+        return None
+    
+    # Fast path: fixed-position fields, no format string interpretation
+    length = len(text)
+    if length in (10, 16, 19) and text[4] == '-' and text[7] == '-':
+        try:
+            year, month, day = int(text[0:4]), int(text[5:7]), int(text[8:10])
+            if length == 10:
+                return datetime(year, month, day)
+            if text[10] == ' ' and text[13] == ':':
+                hour, minute = int(text[11:13]), int(text[14:16])
+                if length == 16:
+                    return datetime(year, month, day, hour, minute)
+                if text[16] == ':':
+                    return datetime(year, month, day, hour, minute, int(text[17:19]))
+        except ValueError:
+            pass
+    
+    if text.isdigit() and length >= 12:
+        return _from_epoch_ms(int(text))
+    
+    # Slow path for anything unusual (e.g. single-digit months)
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    
+    return None
@@ -0,0 +1,357 @@
+"""
+Attachment and course file downloader.
+
+Files are streamed in chunks by a bounded pool of workers over the
+authenticated API session. A broken transfer leaves a ``.part`` file
+that the next attempt (or the next run) resumes with an HTTP Range
+request, guarded by If-Range so a file changed in between starts over.
+Finished files are stored once per content (sha256) under
+``<root>/.objects/`` and hard-linked to ``<root>/<course>/<file>``, so
+identical files shared by several courses or accounts take space once.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from .atomic import write_json
+from .config import (
+    DOWNLOAD_DIR,
+    DOWNLOAD_OBJECTS_DIR,
+    DOWNLOAD_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_RETRIES,
+)
+from .metrics import span
+from .models import CourseFile, Homework
+from .policy import RequestPolicy
+
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+@dataclass
+class DownloadJob:
+    """One remote file and where it should appear under the download root."""
+    url: str
+    path: str  # relative to the download root
+    size: int = 0  # expected size in bytes, 0 if unknown
+
+
+@dataclass
+class DownloadReport:
+    """Outcome of one Downloader.download() call."""
+    downloaded: int = 0  # files transferred (fully or resumed)
+    reused: int = 0  # already downloaded, nothing requested
+    deduplicated: int = 0  # downloaded, but identical to a stored file
+    bytes: int = 0  # bytes received over the network
+    seconds: float = 0.0
+    failed: List[str] = field(default_factory=list)
+    
+    def __str__(self) -> str:
+        rate = self.bytes / self.seconds / 1024 / 1024 if self.seconds else 0
+        return (f"{self.downloaded} downloaded ({self.deduplicated} duplicates), "
+                f"{self.reused} already present, {len(self.failed)} failed, "
+                f"{self.bytes / 1024 / 1024:.1f} MiB "
+                f"in {self.seconds:.1f}s ({rate:.1f} MiB/s)")
+
+
+def safe_name(name: str) -> str:
+    """Turn a title from the server into a safe single path component."""
+    name = _UNSAFE_CHARS.sub('_', name).strip().strip('.')
+    return name[:200] or 'untitled'
+
+
+def homework_jobs(homework_list: Iterable[Homework]) -> List[DownloadJob]:
+    """
+    Jobs for the attachments of each homework item. Reading
+    ``attachments`` loads the item's details if needed (see
+    HomeworkCrawler.load_details to do that in parallel first); items
+    whose details could not be loaded are skipped.
+    """
+    jobs = []
+    seen: Dict[str, str] = {}
+    for hw in homework_list:
+        attachments = hw.attachments
+        if hw.detail_error is not None:
+            continue
+        for attachment in attachments:
+            path = os.path.join(
+                safe_name(hw.course_name), '作业', safe_name(hw.title), safe_name(attachment.name)
+            )
+            # Two assignments with the same title must not overwrite each other
+            if seen.setdefault(path, attachment.url) != attachment.url:
+                stem, ext = os.path.splitext(path)
+                path = f"{stem} ({safe_name(hw.id)}){ext}"
+            jobs.append(DownloadJob(url=attachment.url, path=path))
+    return jobs
+
+
+def course_file_jobs(files: Iterable[CourseFile]) -> List[DownloadJob]:
+    """Jobs for course (课件) files."""
+    jobs = []
+    seen: Dict[str, str] = {}
+    for f in files:
+        path = os.path.join(safe_name(f.course_name), '课件', safe_name(f.filename))
+        # Two files with the same title in one course must not overwrite each other
+        if seen.setdefault(path, f.url) != f.url:
+            stem, ext = os.path.splitext(path)
+            path = f"{stem} ({safe_name(f.id)}){ext}"
+        jobs.append(DownloadJob(url=f.url, path=path, size=f.size))
+    return jobs
+
+
+class Downloader:
+    """
+    Downloads jobs into ``root`` with resumable, deduplicated storage.
+    
+    ``root/.objects/index.json`` remembers which sha256 each URL produced,
+    so files that are already in place are not requested again.
+    """
+    
+    def __init__(
+        self,
+        session: requests.Session,
+        root: str = DOWNLOAD_DIR,
+        workers: int = DOWNLOAD_WORKERS,
+        policy: Optional[RequestPolicy] = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            session: Authenticated session (e.g. from WebLearningAuth.login())
+            root: Download directory
+            workers: Files downloaded in parallel
+            policy: Timeouts, retries and circuit breaker for the requests
+            chunk_size: Bytes read and written at a time
+        """
+        self.session = session
+        self.root = root
+        self.workers = max(1, workers)
+        self.policy = policy or RequestPolicy()
+        self.chunk_size = chunk_size
+        self.objects_dir = os.path.join(root, DOWNLOAD_OBJECTS_DIR)
+        self._index_path = os.path.join(self.objects_dir, 'index.json')
+        self._index = self._load_index()
+        self._lock = threading.Lock()
+    
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self):
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._lock:
+            data = dict(self._index)
+        write_json(self._index_path, data)
+    
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+    
+    def download(self, jobs: Iterable[DownloadJob]) -> DownloadReport:
+        """
+        Download all jobs with the worker pool.
+        Jobs for the same URL are fetched once and linked to every path.
+        """
+        by_url: Dict[str, List[DownloadJob]] = {}
+        for job in jobs:
+            by_url.setdefault(job.url, []).append(job)
+        
+        report = DownloadReport()
+        if not by_url:
+            return report
+        
+        print(f"⬇️ Downloading {len(by_url)} files to {self.root}/ "
+              f"({self.workers} workers)...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for url, received, outcome in executor.map(
+                lambda item: self._download_url(*item), by_url.items()
+            ):
+                report.bytes += received
+                if outcome == 'reused':
+                    report.reused += 1
+                elif outcome in ('downloaded', 'duplicate'):
+                    report.downloaded += 1
+                    report.deduplicated += outcome == 'duplicate'
+                else:
+                    report.failed.append(f"{url}: {outcome}")
+        report.seconds = time.perf_counter() - start
+        
+        self._save_index()
+        print(f"   {report}")
+        for failure in report.failed:
+            print(f"   ⚠️ {failure}")
+        return report
+    
+    def _download_url(self, url: str, jobs: List[DownloadJob]):
+        """
+        Fetch one URL (unless already stored) and link it to its jobs' paths.
+        Returns (url, bytes received, outcome), where outcome is "reused",
+        "downloaded", "duplicate" or an error message.
+        """
+        received = 0
+        outcome = 'reused'
+        expected_size = jobs[0].size
+        try:
+            with self._lock:
+                known = self._index.get(url)
+            if (known
+                    and os.path.exists(self._object_path(known['sha256']))
+                    and (not expected_size or expected_size == known.get('size'))):
+                digest = known['sha256']
+            else:
+                with span('download', url=url):
+                    digest, received, duplicate = self._fetch(url)
+                outcome = 'duplicate' if duplicate else 'downloaded'
+                size = os.path.getsize(self._object_path(digest))
+                with self._lock:
+                    self._index[url] = {'sha256': digest, 'size': size, 'path': jobs[0].path}
+            
+            for job in jobs:
+                self._link(digest, os.path.join(self.root, job.path))
+        except (requests.RequestException, OSError) as e:
+            return url, received, str(e) or e.__class__.__name__
+        return url, received, outcome
+    
+    def _fetch(self, url: str):
+        """
+        Stream ``url`` into the content store, resuming a previous
+        ``.part`` file. Returns (sha256, bytes received, whether the
+        content was already stored).
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        part_path = os.path.join(
+            self.objects_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part'
+        )
+        validator_path = f"{part_path}.validator"
+        received = 0
+        
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            validator = self._read_validator(validator_path) if offset else None
+            # Byte offsets only mean something for the unencoded body
+            headers = {'Accept-Encoding': 'identity'}
+            if offset and validator:
+                # If-Range: the server sends the whole file instead of the
+                # rest if it changed since the .part file was started
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+            else:
+                offset = 0  # nothing to resume, or no way to tell it is current
+            try:
+                response = self.policy.request(
+                    self.session, 'GET', url, headers=headers, stream=True
+                )
+                with response:
+                    if offset and response.status_code != 206:
+                        offset = 0  # file changed or Range ignored: start over
+                    if not offset:
+                        self._write_validator(validator_path, response)
+                    digest = self._hash_part(part_path, offset)
+                    with open(part_path, 'r+b' if offset else 'wb') as f:
+                        f.seek(offset)
+                        f.truncate()
+                        for chunk in response.iter_content(self.chunk_size):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            received += len(chunk)
+                break
+            except requests.HTTPError as e:
+                # 416: the .part file is already complete (or corrupt); start over
+                if e.response is not None and e.response.status_code == 416:
+                    os.remove(part_path)
+                    continue
+                raise
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == DOWNLOAD_RETRIES:
+                    raise
+                print(f"   ↻ Transfer broken ({e.__class__.__name__}), resuming "
+                      f"{url.rsplit('/', 1)[-1]} ({attempt + 1}/{DOWNLOAD_RETRIES})")
+        else:
+            raise requests.RequestException(f"could not download {url}")
+        
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+        hex_digest = digest.hexdigest()
+        object_path = self._object_path(hex_digest)
+        duplicate = os.path.exists(object_path)
+        if duplicate:
+            os.remove(part_path)  # identical content is already stored
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(part_path, object_path)
+        return hex_digest, received, duplicate
+    
+    @staticmethod
+    def _write_validator(validator_path: str, response: requests.Response):
+        """
+        Remember the ETag (or Last-Modified) of a fresh download, so a
+        resume can ask for the rest of exactly this version. Nothing is
+        stored if the body is encoded or has no usable validator; such a
+        download starts over instead of resuming.
+        """
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        etag = response.headers.get('ETag', '')
+        # Weak ETags are not allowed in If-Range
+        validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+        if encoding != 'identity' or not validator:
+            if os.path.exists(validator_path):
+                os.remove(validator_path)
+            return
+        with open(validator_path, 'w', encoding='utf-8') as f:
+            f.write(validator)
+    
+    @staticmethod
+    def _read_validator(validator_path: str) -> Optional[str]:
+        try:
+            with open(validator_path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def _hash_part(self, part_path: str, length: int):
+        """sha256 of the first ``length`` bytes of a partial download."""
+        digest = hashlib.sha256()
+        if not length:
+            return digest
+        with open(part_path, 'rb') as f:
+            remaining = length
+            while remaining:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return digest
+    
+    def _link(self, digest: str, path: str):
+        """Make ``path`` point at the stored object (hard link, else copy)."""
+        object_path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            if os.path.samefile(object_path, path):
+                return
+        except OSError:
+            pass  # path does not exist yet
+        
+        # Unique name: another worker may be linking the same path
+        tmp_path = f"{path}.{uuid.uuid4().hex[:12]}.tmp"
+        try:
+            os.link(object_path, tmp_path)
+        except OSError:
+            # Different filesystem or no hard links: fall back to a copy
+            shutil.copyfile(object_path, tmp_path)
+        os.replace(tmp_path, path)
@@ -0,0 +1,213 @@
+"""
+Timing spans and per-endpoint request metrics for a crawl.
+
+Phases (login, semester lookup, course listing, per-course homework
+fetch, parsing, rendering) are recorded as spans with ``span()``;
+RequestPolicy reports every HTTP call with ``observe_request()``.
+The default registry ``metrics`` can be exported as a Chrome trace
+(chrome://tracing, Perfetto) or as a Prometheus textfile.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from .config import METRICS_MAX_SPANS
+
+# Request latency histogram buckets (seconds), Prometheus' defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointStats:
+    """Latency histogram, byte and outcome counters for one endpoint."""
+    __slots__ = ('buckets', 'count', 'seconds', 'bytes', 'errors')
+    
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.errors = 0
+    
+    def observe(self, seconds: float, size: int, ok: bool):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.seconds += seconds
+        self.bytes += size
+        if not ok:
+            self.errors += 1
+    
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """(upper bound, cumulative count) pairs, as Prometheus expects."""
+        total = 0
+        result = []
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """
+    Thread-safe registry of spans, endpoint stats and gauges.
+    
+    Only the most recent ``max_spans`` spans are kept, so a long
+    --watch session does not grow without bound.
+    """
+    
+    def __init__(self, max_spans: int = METRICS_MAX_SPANS):
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._origin_epoch = time.time()
+        self.spans = deque(maxlen=max_spans)
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.gauges: Dict[str, Tuple[float, str]] = {}
+    
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Time the enclosed block as a span called ``name``.
+        Keyword arguments are attached to the span (e.g. course=...).
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e.__class__.__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            record = {
+                'name': name,
+                'start': start - self._origin,
+                'duration': end - start,
+                'thread': threading.get_ident(),
+                'attrs': attrs,
+            }
+            if error:
+                record['error'] = error
+            with self._lock:
+                self.spans.append(record)
+    
+    def observe_request(self, url: str, seconds: float, size: int, ok: bool = True):
+        """Record one HTTP call; the endpoint is the last path segment of ``url``."""
+        endpoint = url.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            stats.observe(seconds, size, ok)
+    
+    def set_gauge(self, name: str, value: float, help_text: str = ''):
+        """Set a crawl-level gauge, exported as ``wlxt_<name>``."""
+        with self._lock:
+            self.gauges[name] = (value, help_text)
+    
+    def phase_totals(self) -> Dict[str, Tuple[int, float]]:
+        """Span name -> (count, total seconds)."""
+        totals: Dict[str, Tuple[int, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            count, seconds = totals.get(record['name'], (0, 0.0))
+            totals[record['name']] = (count + 1, seconds + record['duration'])
+        return totals
+    
+    def trace(self) -> dict:
+        """
+        Spans as a Chrome trace event document, plus endpoint summaries.
+        Load it in chrome://tracing or https://ui.perfetto.dev.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            endpoints = {
+                name: {
+                    'requests': s.count,
+                    'errors': s.errors,
+                    'bytes': s.bytes,
+                    'seconds': round(s.seconds, 6),
+                    'buckets': {str(b): c for b, c in s.cumulative_buckets()},
+                }
+                for name, s in self.endpoints.items()
+            }
+        
+        events = []
+        for record in spans:
+            args = dict(record['attrs'])
+            if 'error' in record:
+                args['error'] = record['error']
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'ts': round(record['start'] * 1e6),
+                'dur': round(record['duration'] * 1e6),
+                'pid': pid,
+                'tid': record['thread'],
+                'args': args,
+            })
+        
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'started_at': self._origin_epoch},
+            'endpoints': endpoints,
+        }
+    
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP wlxt_{name} {help_text}")
+            lines.append(f"# TYPE wlxt_{name} {kind}")
+        
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            gauges = sorted(self.gauges.items())
+        
+        metric('request_duration_seconds', 'histogram', 'HTTP request latency per endpoint.')
+        for name, s in endpoints:
+            for bound, count in s.cumulative_buckets():
+                lines.append(f'wlxt_request_duration_seconds_bucket{{endpoint="{name}",le="{bound}"}} {count}')
+            lines.append(f'wlxt_request_duration_seconds_bucket{{endpoint="{name}",le="+Inf"}} {s.count}')
+            lines.append(f'wlxt_request_duration_seconds_sum{{endpoint="{name}"}} {s.seconds:.6f}')
+            lines.append(f'wlxt_request_duration_seconds_count{{endpoint="{name}"}} {s.count}')
+        
+        metric('request_errors_total', 'counter', 'HTTP requests that failed or were retried.')
+        for name, s in endpoints:
+            lines.append(f'wlxt_request_errors_total{{endpoint="{name}"}} {s.errors}')
+        
+        metric('response_bytes_total', 'counter', 'Response body bytes (decoded) per endpoint.')
+        for name, s in endpoints:
+            lines.append(f'wlxt_response_bytes_total{{endpoint="{name}"}} {s.bytes}')
+        
+        metric('phase_duration_seconds', 'gauge', 'Total time spent in each crawl phase.')
+        totals = self.phase_totals()
+        for name in sorted(totals):
+            lines.append(f'wlxt_phase_duration_seconds{{phase="{name}"}} {totals[name][1]:.6f}')
+        
+        metric('phase_spans', 'gauge', 'Number of spans recorded for each crawl phase.')
+        for name in sorted(totals):
+            lines.append(f'wlxt_phase_spans{{phase="{name}"}} {totals[name][0]}')
+        
+        for name, (value, help_text) in gauges:
+            metric(name, 'gauge', help_text or name)
+            lines.append(f"wlxt_{name} {value}")
+        
+        return '\n'.join(lines) + '\n'
+
+
+# Default registry used by the crawler, auth and output modules
+metrics = Metrics()
+
+
+def span(name: str, **attrs):
+    """Time a block in the default registry, see Metrics.span()."""
+    return metrics.span(name, **attrs)
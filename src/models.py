@@ -1,9 +1,41 @@
 """
 Data models for courses and homework.
 """
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def format_time_left(deadline: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """Format the time remaining until a deadline, e.g. "3天" or "5小时"."""
+    if not deadline:
+        return ""
+    
+    diff = deadline - (now or datetime.now())
+    if diff.total_seconds() < 0:
+        return "已过期"
+    elif diff.days > 0:
+        return f"{diff.days}天"
+    else:
+        hours = int(diff.total_seconds() // 3600)
+        return f"{hours}小时"
+
+
+class Clock:
+    """
+    A single "now" shared by one evaluation pass (sorting, rendering).
+    Create one per run and pass it around, so every urgency, expiry and
+    time-left value is derived from the same instant.
+    """
+    __slots__ = ('now', 'timestamp')
+    
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.now()
+        self.timestamp = self.now.timestamp()
 
 
 @dataclass
@@ -20,30 +52,140 @@ class Course:
 
 
 @dataclass
+class CourseFile:
+    """A file published in a course's 课件 (course files) section."""
+    id: str
+    course_id: str
+    course_name: str
+    title: str
+    file_type: str = ""  # extension without the dot, e.g. "pdf"
+    size: int = 0  # bytes, 0 if unknown
+    url: str = ""
+    
+    @property
+    def filename(self) -> str:
+        if self.file_type and not self.title.lower().endswith(f".{self.file_type.lower()}"):
+            return f"{self.title}.{self.file_type}"
+        return self.title
+
+
+@dataclass
+class FetchFailure:
+    """A homework list that could not be fetched during a crawl."""
+    course_id: str
+    course_name: str
+    status: str  # which list failed: unsubmitted, submitted, graded, detail (page), files (课件)
+    error: str
+
+    def __str__(self) -> str:
+        return f"{self.course_name} ({self.status}): {self.error}"
+
+
+@dataclass
+class Attachment:
+    """A file attached to a homework assignment."""
+    name: str
+    url: str
+
+
+@dataclass
+class HomeworkDetail:
+    """Full assignment page: instructions, attachments and grading feedback."""
+    body: str = ""
+    attachments: List[Attachment] = field(default_factory=list)
+    feedback: str = ""
+
+
+@dataclass(**_SLOTS)
 class Homework:
-    """Represents a homework assignment."""
+    """
+    Represents a homework assignment.
+    
+    ``body``, ``attachments`` and ``feedback`` come from the assignment
+    page, which is only requested (through ``detail_loader``) the first
+    time one of them is read. If that request fails, the fields stay
+    empty, ``detail_error`` says why, and the page is not requested again.
+    """
     id: str
     title: str
     course_name: str
     course_id: str
     deadline: Optional[datetime] = None
     deadline_str: str = ""
-    status: str = "unsubmitted"  # unsubmitted, submitted, expired
+    status: str = "unsubmitted"  # unsubmitted, submitted, graded, expired
     time_left: str = ""
     description: str = ""
+    # Deadline as epoch seconds, precomputed for fast comparisons
+    deadline_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    # Fetches the assignment page; set by HomeworkCrawler
+    detail_loader: Optional[Callable[[], HomeworkDetail]] = field(
+        default=None, repr=False, compare=False
+    )
+    _detail: Optional[HomeworkDetail] = field(default=None, init=False, repr=False, compare=False)
+    detail_error: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.deadline_ts = self.deadline.timestamp() if self.deadline else None
     
     def __str__(self) -> str:
         return f"[{self.course_name}] {self.title} - Due: {self.deadline_str}"
     
+    @property
+    def detail(self) -> HomeworkDetail:
+        """
+        The assignment details, loaded on first access. Without a loader
+        (e.g. scraped or snapshot items) the list description is the body.
+        """
+        if self._detail is None:
+            if self.detail_loader is not None:
+                try:
+                    self._detail = self.detail_loader()
+                except Exception as e:
+                    self.detail_error = str(e) or e.__class__.__name__
+                    self._detail = HomeworkDetail()
+            else:
+                self._detail = HomeworkDetail(body=self.description)
+        return self._detail
+    
+    @property
+    def detail_loaded(self) -> bool:
+        """Whether the details have been loaded (no request will be made)."""
+        return self._detail is not None
+    
+    @property
+    def body(self) -> str:
+        return self.detail.body
+    
+    @property
+    def attachments(self) -> List[Attachment]:
+        return self.detail.attachments
+    
+    @property
+    def feedback(self) -> str:
+        return self.detail.feedback
+    
+    @property
+    def is_done(self) -> bool:
+        """Check if homework has been handed in (submitted or graded)."""
+        return self.status in ("submitted", "graded")
+    
     @property
     def is_expired(self) -> bool:
         """Check if homework deadline has passed."""
-        if self.deadline:
-            return datetime.now() > self.deadline
-        return False
+        return self.expired_at(Clock())
     
     @property
     def urgency_level(self) -> int:
+        """Urgency level right now, see urgency_at()."""
+        return self.urgency_at(Clock())
+    
+    def expired_at(self, clock: Clock) -> bool:
+        """Check if homework deadline has passed at ``clock``."""
+        if self.deadline_ts is not None:
+            return clock.timestamp > self.deadline_ts
+        return False
+    
+    def urgency_at(self, clock: Clock) -> int:
         """
         Return urgency level for sorting (lower = more urgent).
         0 = expired
@@ -53,14 +195,13 @@ class Homework:
         4 = due later
         5 = no deadline set
         """
-        if not self.deadline:
+        if self.deadline_ts is None:
             return 5  # No deadline - lowest priority
         
-        if self.is_expired:
+        if self.expired_at(clock):
             return 0
         
-        time_diff = self.deadline - datetime.now()
-        hours_left = time_diff.total_seconds() / 3600
+        hours_left = (self.deadline_ts - clock.timestamp) / 3600
         
         if hours_left < 24:
             return 1
@@ -70,3 +211,27 @@ class Homework:
             return 3
         else:
             return 4
+    
+    def time_left_at(self, clock: Clock) -> str:
+        """
+        Time remaining at ``clock``, e.g. "3天" or "5小时".
+        Falls back to the scraped ``time_left`` text when there is no deadline.
+        """
+        if self.deadline_ts is None:
+            return self.time_left
+        
+        seconds_left = self.deadline_ts - clock.timestamp
+        if seconds_left < 0:
+            return "已过期"
+        elif seconds_left >= 86400:
+            return f"{int(seconds_left // 86400)}天"
+        else:
+            return f"{int(seconds_left // 3600)}小时"
+    
+    def sort_key(self, clock: Clock) -> tuple:
+        """Sort key: by deadline, with expired and undated homework last."""
+        return (
+            self.deadline_ts is None,
+            self.expired_at(clock),
+            self.deadline_ts if self.deadline_ts is not None else float('inf'),
+        )
@@ -1,15 +1,24 @@
 """
 Output generation module for homework reports.
-Generates HTML and JSON output files.
+Generates HTML, JSON and NDJSON output files.
 """
 import html
 import json
 import os
-from datetime import datetime
-from typing import List
+from dataclasses import asdict
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from .config import OUTPUT_DIR, HTML_OUTPUT_FILE, JSON_OUTPUT_FILE
-from .models import Homework
+from .atomic import atomic_open
+from .config import (
+    OUTPUT_DIR,
+    HTML_OUTPUT_FILE,
+    JSON_OUTPUT_FILE,
+    NDJSON_OUTPUT_FILE,
+    METRICS_TRACE_FILE,
+    METRICS_PROM_FILE,
+)
+from .metrics import Metrics, metrics as default_metrics, span
+from .models import Clock, FetchFailure, Homework
 
 
 def ensure_output_dir():
@@ -18,34 +27,14 @@ def ensure_output_dir():
         os.makedirs(OUTPUT_DIR)
 
 
-def generate_html(homework_list: List[Homework], output_path: str = None) -> str:
-    """
-    Generate an HTML report of homework assignments.
-    
-    Args:
-        homework_list: List of Homework objects
-        output_path: Optional custom output path
-    
-    Returns:
-        Path to the generated HTML file
-    """
-    ensure_output_dir()
-    
-    if output_path is None:
-        output_path = os.path.join(OUTPUT_DIR, HTML_OUTPUT_FILE)
-    
-    # Separate active and expired homework
-    active = [h for h in homework_list if not h.is_expired]
-    expired = [h for h in homework_list if h.is_expired]
-    
-    html_content = f"""<!DOCTYPE html>
+_HTML_HEAD = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>网络学堂作业列表</title>
     <style>
-        :root {{
+        :root {
             --bg-primary: #0f0f1a;
             --bg-secondary: #1a1a2e;
             --bg-card: #252542;
@@ -57,186 +46,225 @@ def generate_html(homework_list: List[Homework], output_path: str = None) -> str
             --accent-info: #70a1ff;
             --gradient-1: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             --shadow: 0 8px 32px rgba(0, 0, 0, 0.4);
-        }}
+        }
         
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: var(--bg-primary);
             color: var(--text-primary);
             min-height: 100vh;
             padding: 2rem;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1000px;
             margin: 0 auto;
-        }}
+        }
         
-        header {{
+        header {
             text-align: center;
             margin-bottom: 3rem;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             background: var(--gradient-1);
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
             background-clip: text;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             color: var(--text-secondary);
             font-size: 0.95rem;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: flex;
             gap: 1rem;
             justify-content: center;
             margin-top: 1.5rem;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: var(--bg-secondary);
             padding: 1rem 1.5rem;
             border-radius: 12px;
             text-align: center;
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 2rem;
             font-weight: 700;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 0.8rem;
             color: var(--text-secondary);
             text-transform: uppercase;
-        }}
+        }
         
-        .stat-urgent .stat-number {{ color: var(--accent-urgent); }}
-        .stat-active .stat-number {{ color: var(--accent-normal); }}
-        .stat-expired .stat-number {{ color: var(--text-secondary); }}
+        .stat-urgent .stat-number { color: var(--accent-urgent); }
+        .stat-active .stat-number { color: var(--accent-normal); }
+        .stat-expired .stat-number { color: var(--text-secondary); }
         
-        section {{
+        section {
             margin-bottom: 2rem;
-        }}
+        }
         
-        h2 {{
+        h2 {
             font-size: 1.3rem;
             margin-bottom: 1rem;
             padding-bottom: 0.5rem;
             border-bottom: 2px solid var(--bg-card);
-        }}
+        }
         
-        .homework-list {{
+        .homework-list {
             display: flex;
             flex-direction: column;
             gap: 1rem;
-        }}
+        }
         
-        .homework-card {{
+        .homework-card {
             background: var(--bg-card);
             border-radius: 16px;
             padding: 1.5rem;
             transition: transform 0.2s, box-shadow 0.2s;
             border-left: 4px solid var(--accent-info);
-        }}
+        }
         
-        .homework-card:hover {{
+        .homework-card:hover {
             transform: translateY(-2px);
             box-shadow: var(--shadow);
-        }}
+        }
         
-        .homework-card.urgent {{
+        .homework-card.urgent {
             border-left-color: var(--accent-urgent);
             animation: pulse 2s infinite;
-        }}
+        }
         
-        .homework-card.warning {{
+        .homework-card.warning {
             border-left-color: var(--accent-warning);
-        }}
+        }
         
-        .homework-card.expired {{
+        .homework-card.expired {
             border-left-color: var(--text-secondary);
             opacity: 0.6;
-        }}
+        }
         
-        @keyframes pulse {{
-            0%, 100% {{ box-shadow: 0 0 0 0 rgba(255, 71, 87, 0.4); }}
-            50% {{ box-shadow: 0 0 20px 5px rgba(255, 71, 87, 0.2); }}
-        }}
+        @keyframes pulse {
+            0%, 100% { box-shadow: 0 0 0 0 rgba(255, 71, 87, 0.4); }
+            50% { box-shadow: 0 0 20px 5px rgba(255, 71, 87, 0.2); }
+        }
         
-        .homework-header {{
+        .homework-header {
             display: flex;
             justify-content: space-between;
             align-items: flex-start;
             margin-bottom: 0.8rem;
-        }}
+        }
         
-        .homework-title {{
+        .homework-title {
             font-size: 1.1rem;
             font-weight: 600;
-        }}
+        }
         
-        .homework-deadline {{
+        .homework-deadline {
             font-size: 0.85rem;
             padding: 0.3rem 0.8rem;
             border-radius: 20px;
             background: var(--bg-secondary);
-        }}
+        }
         
-        .homework-deadline.urgent {{
+        .homework-deadline.urgent {
             background: var(--accent-urgent);
             color: white;
-        }}
+        }
         
-        .homework-deadline.warning {{
+        .homework-deadline.warning {
             background: var(--accent-warning);
             color: #1a1a2e;
-        }}
+        }
         
-        .homework-course {{
+        .homework-course {
             color: var(--text-secondary);
             font-size: 0.9rem;
-        }}
+        }
         
-        .time-left {{
+        .time-left {
             font-weight: 500;
             margin-left: 0.5rem;
-        }}
+        }
         
-        .empty-state {{
+        .empty-state {
             text-align: center;
             padding: 3rem;
             color: var(--text-secondary);
-        }}
+        }
         
-        footer {{
+        footer {
             text-align: center;
             margin-top: 3rem;
             color: var(--text-secondary);
             font-size: 0.85rem;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="container">
-        <header>
+    """
+
+_HTML_FOOT = """
+        </main>
+        
+        <footer>
+            <p>网络学堂作业爬虫 | 数据来自 learn.tsinghua.edu.cn</p>
+        </footer>
+    </div>
+</body>
+</html>"""
+
+
+def render_html(homework_list: Iterable[Homework], clock: Optional[Clock] = None) -> Iterator[str]:
+    """
+    Render the HTML report as a stream of chunks.
+    
+    Only references to the homework are kept (to count and split them);
+    the markup itself is produced one card at a time.
+    
+    Args:
+        homework_list: Homework objects (any iterable)
+        clock: Evaluation time for expiry/urgency (defaults to now)
+    
+    Yields:
+        Pieces of the HTML document, in order
+    """
+    clock = clock or Clock()
+    
+    # Separate active and expired homework (handed-in work is not listed)
+    active = []
+    expired = []
+    for hw in homework_list:
+        if hw.is_done:
+            continue
+        (expired if hw.expired_at(clock) else active).append(hw)
+    urgent_count = sum(1 for h in active if h.urgency_at(clock) == 1)
+    
+    yield _HTML_HEAD
+    yield f"""    <header>
             <h1>📚 网络学堂作业</h1>
-            <p class="subtitle">生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p class="subtitle">生成时间: {clock.now.strftime('%Y-%m-%d %H:%M:%S')}</p>
             
             <div class="stats">
                 <div class="stat-card stat-urgent">
-                    <div class="stat-number">{len([h for h in active if h.urgency_level == 1])}</div>
+                    <div class="stat-number">{urgent_count}</div>
                     <div class="stat-label">紧急 (24h内)</div>
                 </div>
                 <div class="stat-card stat-active">
@@ -254,54 +282,93 @@ def generate_html(homework_list: List[Homework], output_path: str = None) -> str
             <section>
                 <h2>📝 待完成作业</h2>
                 <div class="homework-list">
-                    {_generate_homework_cards(active) if active else '<div class="empty-state">🎉 没有待完成的作业!</div>'}
+                    """
+    
+    if active:
+        yield from _iter_homework_cards(active, clock)
+    else:
+        yield '<div class="empty-state">🎉 没有待完成的作业!</div>'
+    
+    yield """
                 </div>
             </section>
             
-            {f'''<section>
+            """
+    
+    if expired:
+        yield """<section>
                 <h2>⏰ 已过期作业</h2>
                 <div class="homework-list">
-                    {_generate_homework_cards(expired, expired=True)}
+                    """
+        yield from _iter_homework_cards(expired, clock, expired=True)
+        yield """
                 </div>
-            </section>''' if expired else ''}
-        </main>
-        
-        <footer>
-            <p>网络学堂作业爬虫 | 数据来自 learn.tsinghua.edu.cn</p>
-        </footer>
-    </div>
-</body>
-</html>"""
+            </section>"""
+    
+    yield _HTML_FOOT
+
+
+def generate_html(
+    homework_list: Iterable[Homework],
+    output_path: str = None,
+    clock: Optional[Clock] = None,
+) -> str:
+    """
+    Generate an HTML report of homework assignments.
+    
+    The report is streamed to a temporary file and renamed into place,
+    so readers never see a half-written report.
+    
+    Args:
+        homework_list: Homework objects (any iterable)
+        output_path: Optional custom output path
+        clock: Evaluation time for expiry/urgency (defaults to now)
+    
+    Returns:
+        Path to the generated HTML file
+    """
+    ensure_output_dir()
+    
+    if output_path is None:
+        output_path = os.path.join(OUTPUT_DIR, HTML_OUTPUT_FILE)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with span('render', format='html'), atomic_open(output_path) as f:
+        for chunk in render_html(homework_list, clock):
+            f.write(chunk)
     
     print(f"📄 HTML report saved to: {output_path}")
     return output_path
 
 
-def _generate_homework_cards(homework_list: List[Homework], expired: bool = False) -> str:
-    """Generate HTML cards for homework items."""
-    cards = []
-    
-    for hw in homework_list:
+def _iter_homework_cards(
+    homework_list: List[Homework],
+    clock: Clock,
+    expired: bool = False,
+) -> Iterator[str]:
+    """Yield HTML cards for homework items, newline-separated."""
+    for i, hw in enumerate(homework_list):
+        urgency = hw.urgency_at(clock)
+        time_left = hw.time_left_at(clock)
+        
         # Determine urgency class
         if expired:
             urgency_class = "expired"
             deadline_class = ""
-        elif hw.urgency_level == 1:
+        elif urgency == 1:
             urgency_class = "urgent"
             deadline_class = "urgent"
-        elif hw.urgency_level == 2:
+        elif urgency == 2:
             urgency_class = "warning"
             deadline_class = "warning"
         else:
             urgency_class = ""
             deadline_class = ""
         
-        time_display = f'<span class="time-left">({html.escape(hw.time_left)})</span>' if hw.time_left else ''
+        time_display = f'<span class="time-left">({html.escape(time_left)})</span>' if time_left else ''
         
-        card = f'''
+        if i:
+            yield '\n'
+        yield f'''
         <div class="homework-card {urgency_class}">
             <div class="homework-header">
                 <span class="homework-title">{html.escape(hw.title)}</span>
@@ -311,46 +378,147 @@ def _generate_homework_cards(homework_list: List[Homework], expired: bool = Fals
             </div>
             <div class="homework-course">{html.escape(hw.course_name)}</div>
         </div>'''
-        cards.append(card)
-    
-    return '\n'.join(cards)
 
 
-def generate_json(homework_list: List[Homework], output_path: str = None) -> str:
+def _homework_record(hw: Homework, clock: Clock, details: bool = False) -> dict:
+    """
+    JSON record for one homework item. With ``details`` the assignment
+    page fields are included, loading them if that has not happened yet;
+    they are null if the page could not be loaded.
+    """
+    record = {
+        'id': hw.id,
+        'title': hw.title,
+        'course_name': hw.course_name,
+        'deadline': hw.deadline_str,
+        'status': hw.status,
+        'time_left': hw.time_left_at(clock),
+        'is_expired': hw.expired_at(clock),
+    }
+    if details:
+        detail = hw.detail
+        failed = hw.detail_error is not None
+        record['body'] = None if failed else detail.body
+        record['attachments'] = None if failed else [asdict(a) for a in detail.attachments]
+        record['feedback'] = None if failed else detail.feedback
+    return record
+
+
+def generate_json(
+    homework_list: List[Homework],
+    output_path: str = None,
+    clock: Optional[Clock] = None,
+    compact: bool = False,
+    failures: Optional[List[FetchFailure]] = None,
+    details: bool = False,
+) -> str:
     """
     Generate a JSON file of homework assignments.
     
+    The file is written to a temporary file and renamed into place, so
+    readers polling it never see a half-written document.
+    
     Args:
         homework_list: List of Homework objects
         output_path: Optional custom output path
+        clock: Evaluation time for expiry/time left (defaults to now)
+        compact: Write without indentation or extra whitespace
+        failures: Homework lists that could not be fetched; included as
+                  "failures" so consumers can tell missing data from no data
+        details: Include body, attachments and feedback (see
+                 HomeworkCrawler.load_details to fetch them in parallel)
     
     Returns:
         Path to the generated JSON file
     """
     ensure_output_dir()
+    clock = clock or Clock()
     
     if output_path is None:
         output_path = os.path.join(OUTPUT_DIR, JSON_OUTPUT_FILE)
     
     data = {
-        'generated_at': datetime.now().isoformat(),
+        'generated_at': clock.now.isoformat(),
         'total_count': len(homework_list),
-        'homework': [
-            {
-                'id': hw.id,
-                'title': hw.title,
-                'course_name': hw.course_name,
-                'deadline': hw.deadline_str,
-                'status': hw.status,
-                'time_left': hw.time_left,
-                'is_expired': hw.is_expired,
-            }
-            for hw in homework_list
-        ]
+        'homework': [_homework_record(hw, clock, details) for hw in homework_list]
     }
+    if failures is not None:
+        data['failures'] = [asdict(f) for f in failures]
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with span('render', format='json'), atomic_open(output_path) as f:
+        if compact:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
     
     print(f"📄 JSON data saved to: {output_path}")
     return output_path
+
+
+def generate_ndjson(
+    homework_list: Iterable[Homework],
+    output_path: str = None,
+    clock: Optional[Clock] = None,
+    details: bool = False,
+) -> str:
+    """
+    Generate a newline-delimited JSON file, one compact record per line.
+    
+    Records are written as the iterable produces them (e.g. straight from
+    HomeworkCrawler.iter_all_homework), then the file is renamed into place.
+    
+    Args:
+        homework_list: Homework objects (any iterable)
+        output_path: Optional custom output path
+        clock: Evaluation time for expiry/time left (defaults to now)
+        details: Include body, attachments and feedback
+    
+    Returns:
+        Path to the generated NDJSON file
+    """
+    ensure_output_dir()
+    clock = clock or Clock()
+    
+    if output_path is None:
+        output_path = os.path.join(OUTPUT_DIR, NDJSON_OUTPUT_FILE)
+    
+    count = 0
+    with span('render', format='ndjson'), atomic_open(output_path) as f:
+        for hw in homework_list:
+            record = _homework_record(hw, clock, details)
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    
+    print(f"📄 NDJSON data ({count} records) saved to: {output_path}")
+    return output_path
+
+
+def generate_metrics(output_dir: str = None, metrics: Optional[Metrics] = None) -> Tuple[str, str]:
+    """
+    Write the crawl metrics as a Chrome trace (JSON) and a Prometheus textfile.
+    
+    Both files are renamed into place, so a node exporter textfile
+    collector pointed at ``output_dir`` never reads a partial file.
+    
+    Args:
+        output_dir: Directory for both files (defaults to OUTPUT_DIR)
+        metrics: Registry to export (defaults to the shared one)
+    
+    Returns:
+        (trace path, Prometheus textfile path)
+    """
+    metrics = metrics or default_metrics
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    
+    trace_path = os.path.join(output_dir, METRICS_TRACE_FILE)
+    with atomic_open(trace_path) as f:
+        json.dump(metrics.trace(), f, ensure_ascii=False)
+    
+    prom_path = os.path.join(output_dir, METRICS_PROM_FILE)
+    with atomic_open(prom_path) as f:
+        f.write(metrics.prometheus())
+    
+    print(f"📈 Metrics saved to: {trace_path}, {prom_path}")
+    return trace_path, prom_path
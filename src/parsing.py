@@ -0,0 +1,88 @@
+"""
+HTML parsing helpers for the Selenium flow and the assignment pages.
+Pages are parsed with the fastest available BeautifulSoup backend, and only
+the part of the page that is actually scraped is turned into a tree.
+"""
+from typing import Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import Tag
+
+from .config import HTML_PARSER, BASE_URL
+from .models import Attachment, HomeworkDetail
+
+try:
+    import lxml  # noqa: F401
+    _FAST_PARSER = 'lxml'
+except ImportError:
+    _FAST_PARSER = 'html.parser'
+
+
+def get_parser() -> str:
+    """Return the BeautifulSoup backend to use (HTML_PARSER or auto-detected)."""
+    return HTML_PARSER or _FAST_PARSER
+
+
+def parse_scoped(page_source: str, name: str, **attrs) -> BeautifulSoup:
+    """
+    Parse only the ``name`` elements (matching ``attrs``) of a page.
+    Everything outside them is skipped while parsing.
+    """
+    strainer = SoupStrainer(name, attrs=attrs)
+    return BeautifulSoup(page_source, get_parser(), parse_only=strainer)
+
+
+def find_course_container(page_source: str) -> Optional[Tag]:
+    """Return ``div#suoxuecourse`` from the landing page, or None."""
+    soup = parse_scoped(page_source, 'div', id='suoxuecourse')
+    return soup.find('div', id='suoxuecourse')
+
+
+def find_homework_table(page_source: str) -> Optional[Tag]:
+    """
+    Return the unsubmitted homework table (``table#wtj``, falling back to
+    the first ``table.dataTable``) from a homework page, or None.
+    """
+    soup = parse_scoped(page_source, 'table')
+    table = soup.find('table', id='wtj')  # wtj = 未提交 (unsubmitted)
+    if not table:
+        # Try alternative selector
+        table = soup.find('table', class_='dataTable')
+    return table
+
+
+def parse_homework_detail(page_source: str) -> HomeworkDetail:
+    """
+    Extract instructions, attachments and grading feedback from an
+    assignment page (HOMEWORK_DETAIL_URL).
+    
+    The page is a stack of ``div.list`` rows, each with a label in
+    ``div.left`` and the content in ``div.right``; rows are recognised
+    by their label rather than their position.
+    """
+    # Strain on <div> only: class filters in SoupStrainer do not match
+    # multi-class elements consistently across bs4 versions
+    soup = parse_scoped(page_source, 'div')
+    detail = HomeworkDetail()
+    
+    for row in soup.find_all('div', class_='list'):
+        label_div = row.find('div', class_='left')
+        content_div = row.find('div', class_='right')
+        if not label_div or not content_div:
+            continue
+        label = label_div.get_text(strip=True)
+        
+        if 'fujian' in row.get('class', []) or '附件' in label:
+            for link in content_div.find_all('a', href=True):
+                name = link.get_text(strip=True)
+                if name:
+                    detail.attachments.append(
+                        Attachment(name=name, url=urljoin(BASE_URL + '/', link['href']))
+                    )
+        elif '评语' in label or '批阅' in label:
+            detail.feedback = detail.feedback or content_div.get_text('\n', strip=True)
+        elif '说明' in label or '内容' in label:
+            detail.body = detail.body or content_div.get_text('\n', strip=True)
+    
+    return detail
@@ -0,0 +1,203 @@
+"""
+Request policy for 网络学堂 API calls: per-call timeouts, jittered
+exponential backoff for idempotent requests, and a circuit breaker that
+stops hammering the server while it is unhealthy.
+"""
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from .config import (
+    REQUEST_TIMEOUT,
+    REQUEST_MAX_RETRIES,
+    REQUEST_BACKOFF_BASE,
+    REQUEST_BACKOFF_MAX,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+)
+from .metrics import Metrics, metrics as default_metrics
+
+# Server-side or throttling responses that are worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Transport errors that are worth retrying; a body cut off or garbled
+# mid-transfer is as transient as a dropped connection
+RETRY_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.HTTPError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures. While open,
+    calls fail immediately; after ``reset_timeout`` seconds one trial call
+    is let through, and its outcome closes or re-opens the circuit.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+    
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"server unhealthy, not sending requests (retry in {max(remaining, 0):.0f}s)"
+                )
+            # Half-open: let exactly one trial call through
+            self._trial_in_flight = True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"   🚫 {self._failures} failures in a row, pausing requests "
+                          f"for {self.reset_timeout:.0f}s")
+                self._opened_at = time.monotonic()
+
+
+class RequestPolicy:
+    """
+    Sends requests through a session with timeouts, retries and a
+    shared circuit breaker.
+    """
+    
+    def __init__(
+        self,
+        timeout=REQUEST_TIMEOUT,
+        max_retries: int = REQUEST_MAX_RETRIES,
+        backoff_base: float = REQUEST_BACKOFF_BASE,
+        backoff_max: float = REQUEST_BACKOFF_MAX,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Args:
+            timeout: requests timeout, seconds or (connect, read)
+            max_retries: Retries after the first attempt (idempotent calls only)
+            backoff_base: Backoff ceiling for the first retry, doubled each time
+            backoff_max: Upper bound for a single backoff
+            breaker: Circuit breaker shared by all calls (one is created if None)
+            metrics: Registry that records latency and size of every attempt
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or default_metrics
+    
+    def request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        idempotent: bool = True,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request and return a successful response.
+        
+        Args:
+            session: Session to send through
+            method: HTTP method
+            url: Request URL
+            idempotent: Whether the request is safe to retry. The 网络学堂
+                        list endpoints are read-only POSTs, so they are.
+            **kwargs: Passed on to session.request()
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+            requests.RequestException: If the request still fails after retries
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        attempts = self.max_retries + 1 if idempotent else 1
+        
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+                # A streamed body is left unread; count its declared size
+                if kwargs.get('stream'):
+                    size = int(response.headers.get('Content-Length') or 0)
+                else:
+                    size = len(response.content)
+                self.metrics.observe_request(
+                    url,
+                    time.perf_counter() - start,
+                    size,
+                    ok=response.status_code < 400,
+                )
+                if response.status_code in RETRY_STATUSES:
+                    raise requests.HTTPError(
+                        f"{response.status_code} Server Error for url: {url}",
+                        response=response,
+                    )
+            except RETRY_ERRORS as e:
+                if not isinstance(e, requests.HTTPError):
+                    self.metrics.observe_request(url, time.perf_counter() - start, 0, ok=False)
+                self.breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                delay = self._backoff(attempt, getattr(e, 'response', None))
+                print(f"   ↻ {e.__class__.__name__} on {url.rsplit('/', 1)[-1]}, "
+                      f"retrying in {delay:.1f}s ({attempt + 1}/{attempts - 1})")
+                time.sleep(delay)
+                continue
+            except requests.RequestException:
+                # Not worth retrying (e.g. too many redirects), but it still
+                # counts as a failure and ends a half-open trial call
+                self.metrics.observe_request(url, time.perf_counter() - start, 0, ok=False)
+                self.breaker.record_failure()
+                raise
+            
+            # Any other status means the server answered; client errors
+            # are not retried and do not count against its health
+            self.breaker.record_success()
+            response.raise_for_status()
+            return response
+    
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After if given."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
@@ -0,0 +1,161 @@
+"""
+Per-phase profiling for main.py (--profile).
+
+Each phase gets its own cProfile run (the calling thread, deterministic)
+and a wall-clock stack sampler covering every thread, so work done by
+the thread and driver pools shows up too. Optionally tracemalloc records
+the peak memory of each phase.
+
+Written to OUTPUT_DIR/PROFILE_DIR:
+    <phase>.txt        pstats sorted by cumulative time
+    <phase>.prof       raw cProfile dump (snakeviz, pstats)
+    stacks.collapsed   sampled stacks, one "frame;frame;... count" per line
+                       (flamegraph.pl, speedscope, inferno)
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .config import OUTPUT_DIR, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of all other threads every ``interval`` seconds."""
+    
+    def __init__(self, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[_collapse(frame)] += 1
+    
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+def _collapse(frame) -> str:
+    """Root-first "func (file:line);..." label for a frame's stack."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class PhaseProfiler:
+    """
+    Profiles named phases of a run, one at a time.
+    
+    Usage:
+        profiler = PhaseProfiler(memory=True)
+        with profiler.phase('courses'):
+            ...
+        profiler.write()
+    """
+    
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        memory: bool = False,
+    ):
+        """
+        Args:
+            output_dir: Where to write the results (default: output/profile)
+            interval: Stack sampling interval in seconds
+            memory: Also record peak memory per phase with tracemalloc
+                    (slows allocation-heavy code down noticeably)
+        """
+        self.output_dir = output_dir or os.path.join(OUTPUT_DIR, PROFILE_DIR)
+        self.interval = interval
+        self.memory = memory
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.stacks: Dict[str, Counter] = {}
+        self.seconds: Dict[str, float] = {}
+        self.peak_memory: Dict[str, int] = {}
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Profile the enclosed block as phase ``name``."""
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        sampler = _StackSampler(self.interval)
+        
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.clear_traces()
+            # clear_traces() also resets the peak
+            baseline = tracemalloc.get_traced_memory()[0]
+        
+        start = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stacks = sampler.stop()
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            self.stacks.setdefault(name, Counter()).update(stacks)
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak)
+    
+    def write(self) -> List[str]:
+        """Write stats and stacks for every phase; returns the written paths."""
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        
+        for name, profile in self.profiles.items():
+            prof_path = os.path.join(self.output_dir, f"{name}.prof")
+            profile.dump_stats(prof_path)
+            
+            text = io.StringIO()
+            stats = pstats.Stats(profile, stream=text)
+            stats.strip_dirs().sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+            txt_path = os.path.join(self.output_dir, f"{name}.txt")
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(f"Phase: {name}  wall time: {self.seconds[name]:.3f}s\n")
+                if name in self.peak_memory:
+                    f.write(f"Peak memory: {self.peak_memory[name] / 1024:.0f} KiB\n")
+                f.write(text.getvalue())
+            paths += [txt_path, prof_path]
+        
+        collapsed_path = os.path.join(self.output_dir, 'stacks.collapsed')
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for name, stacks in self.stacks.items():
+                for stack, count in stacks.most_common():
+                    f.write(f"{name};{stack} {count}\n")
+        paths.append(collapsed_path)
+        
+        self.print_summary()
+        print(f"🔬 Profile saved to: {self.output_dir}/")
+        return paths
+    
+    def print_summary(self):
+        print("\n🔬 Profile by phase:")
+        for name, seconds in self.seconds.items():
+            samples = sum(self.stacks.get(name, {}).values())
+            line = f"   {name:<12} {seconds:8.3f}s  {samples:6d} samples"
+            if name in self.peak_memory:
+                line += f"  peak {self.peak_memory[name] / 1024:8.0f} KiB"
+            print(line)
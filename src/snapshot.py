@@ -0,0 +1,92 @@
+"""
+Snapshot of the previous crawl, used by incremental mode to skip courses
+whose homework has not changed since the last run.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .atomic import write_json
+from .config import SNAPSHOT_FILE, SNAPSHOT_MAX_AGE
+from .models import Homework, format_time_left
+
+
+def homework_to_dict(hw: Homework) -> dict:
+    """Serialize a Homework for the snapshot file."""
+    return {
+        'id': hw.id,
+        'title': hw.title,
+        'course_name': hw.course_name,
+        'course_id': hw.course_id,
+        'deadline': hw.deadline.isoformat() if hw.deadline else None,
+        'deadline_str': hw.deadline_str,
+        'status': hw.status,
+        'description': hw.description,
+    }
+
+
+def homework_from_dict(data: dict) -> Homework:
+    """Rebuild a Homework from the snapshot file, refreshing its time left."""
+    deadline = datetime.fromisoformat(data['deadline']) if data.get('deadline') else None
+    return Homework(
+        id=data.get('id', ''),
+        title=data.get('title', ''),
+        course_name=data.get('course_name', ''),
+        course_id=data.get('course_id', ''),
+        deadline=deadline,
+        deadline_str=data.get('deadline_str', ''),
+        status=data.get('status', 'unsubmitted'),
+        time_left=format_time_left(deadline),
+        description=data.get('description', ''),
+    )
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> Dict[str, dict]:
+    """
+    Load the per-course snapshot.
+    
+    Returns:
+        Mapping of wlkcid -> {'unsubmitted', 'fingerprint', 'fetched_at',
+        'homework'}, or an empty dict if the snapshot is missing or unreadable
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('courses', {})
+
+
+def save_snapshot(courses: Dict[str, dict], path: str = SNAPSHOT_FILE):
+    """Write the per-course snapshot atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    write_json(path, {'saved_at': time.time(), 'courses': courses})
+
+
+def snapshot_entry(
+    unsubmitted: int,
+    fingerprint: str,
+    homework: List[Homework],
+    fetched_at: Optional[float] = None,
+) -> dict:
+    """Build the snapshot record for one course, fetched at ``fetched_at`` (default: now)."""
+    return {
+        'unsubmitted': unsubmitted,
+        'fingerprint': fingerprint,
+        'fetched_at': time.time() if fetched_at is None else fetched_at,
+        'homework': [homework_to_dict(hw) for hw in homework],
+    }
+
+
+def entry_expired(entry: dict, max_age: int = SNAPSHOT_MAX_AGE) -> bool:
+    """
+    Whether a course's entry is too old to reuse. The landing-page
+    fingerprint misses some changes (e.g. a changed deadline), so every
+    course is refetched at least once per ``max_age`` seconds.
+    """
+    return time.time() - entry.get('fetched_at', 0) > max_age
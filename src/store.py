@@ -0,0 +1,233 @@
+"""
+SQLite-backed history of crawled courses and homework.
+
+Every crawl upserts its records (with first/last seen timestamps) in a
+single transaction and logs deadline changes, so history survives the
+output files being overwritten.
+
+Usage:
+    python -m src.store due --hours 48          # due soon, all accounts
+    python -m src.store changes "Course name"   # deadline changes for a course
+"""
+import argparse
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from .config import STORE_FILE
+from .models import Course, Homework
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    crawled_at TEXT NOT NULL,
+    homework_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    teacher TEXT,
+    semester TEXT,
+    course_number TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (account, id)
+);
+
+CREATE TABLE IF NOT EXISTS homework (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    course_id TEXT,
+    course_name TEXT,
+    title TEXT,
+    deadline TEXT,
+    deadline_str TEXT,
+    status TEXT,
+    description TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (account, id)
+);
+
+CREATE TABLE IF NOT EXISTS deadline_changes (
+    account TEXT NOT NULL,
+    homework_id TEXT NOT NULL,
+    course_id TEXT,
+    course_name TEXT,
+    title TEXT,
+    old_deadline TEXT,
+    new_deadline TEXT,
+    changed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_homework_deadline ON homework (deadline);
+CREATE INDEX IF NOT EXISTS idx_homework_course ON homework (course_id);
+CREATE INDEX IF NOT EXISTS idx_homework_course_name ON homework (course_name);
+CREATE INDEX IF NOT EXISTS idx_homework_status ON homework (status);
+CREATE INDEX IF NOT EXISTS idx_changes_course ON deadline_changes (course_id, changed_at);
+CREATE INDEX IF NOT EXISTS idx_changes_course_name ON deadline_changes (course_name, changed_at);
+"""
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat(timespec='seconds') if dt else None
+
+
+class HomeworkStore:
+    """
+    Local SQLite store of homework history.
+    
+    Usage:
+        with HomeworkStore() as store:
+            store.record_crawl(homework_list, courses, account='alice')
+    """
+    
+    def __init__(self, path: str = STORE_FILE):
+        # Batch runs write from several processes; wait for the lock
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+    
+    def record_crawl(
+        self,
+        homework_list: Iterable[Homework],
+        courses: Iterable[Course] = (),
+        account: str = "default",
+        crawled_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Upsert one crawl's courses and homework in a single transaction.
+        
+        Returns:
+            Number of deadline changes detected
+        """
+        homework_list = list(homework_list)
+        now = _iso(crawled_at or datetime.now())
+        
+        with self.conn:
+            previous = dict(self.conn.execute(
+                "SELECT id, deadline FROM homework WHERE account = ?", (account,)
+            ).fetchall())
+            
+            changes = [
+                (account, hw.id, hw.course_id, hw.course_name, hw.title,
+                 previous[hw.id], _iso(hw.deadline), now)
+                for hw in homework_list
+                if hw.id in previous and previous[hw.id] != _iso(hw.deadline)
+            ]
+            self.conn.executemany(
+                "INSERT INTO deadline_changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changes
+            )
+            
+            self.conn.executemany(
+                """
+                INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account, id) DO UPDATE SET
+                    name = excluded.name, teacher = excluded.teacher,
+                    semester = excluded.semester, course_number = excluded.course_number,
+                    last_seen = excluded.last_seen
+                """,
+                [
+                    (account, c.id, c.name, c.teacher, c.semester, c.course_number, now, now)
+                    for c in courses
+                ],
+            )
+            
+            self.conn.executemany(
+                """
+                INSERT INTO homework VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account, id) DO UPDATE SET
+                    course_id = excluded.course_id, course_name = excluded.course_name,
+                    title = excluded.title, deadline = excluded.deadline,
+                    deadline_str = excluded.deadline_str, status = excluded.status,
+                    description = excluded.description, last_seen = excluded.last_seen
+                """,
+                [
+                    (account, hw.id, hw.course_id, hw.course_name, hw.title,
+                     _iso(hw.deadline), hw.deadline_str, hw.status, hw.description, now, now)
+                    for hw in homework_list
+                ],
+            )
+            
+            self.conn.execute(
+                "INSERT INTO crawls (account, crawled_at, homework_count) VALUES (?, ?, ?)",
+                (account, now, len(homework_list)),
+            )
+        
+        return len(changes)
+    
+    def due_within(
+        self,
+        hours: float,
+        account: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> List[sqlite3.Row]:
+        """Unsubmitted homework due in the next ``hours`` hours."""
+        now = now or datetime.now()
+        query = """
+            SELECT * FROM homework
+            WHERE deadline >= ? AND deadline <= ? AND status = 'unsubmitted'
+        """
+        params = [_iso(now), _iso(now + timedelta(hours=hours))]
+        if account:
+            query += " AND account = ?"
+            params.append(account)
+        query += " ORDER BY deadline"
+        return self.conn.execute(query, params).fetchall()
+    
+    def deadline_changes(self, course: str, account: Optional[str] = None) -> List[sqlite3.Row]:
+        """Deadline changes for a course, matched by course id or name."""
+        query = "SELECT * FROM deadline_changes WHERE (course_id = ? OR course_name = ?)"
+        params = [course, course]
+        if account:
+            query += " AND account = ?"
+            params.append(account)
+        query += " ORDER BY changed_at"
+        return self.conn.execute(query, params).fetchall()
+    
+    def close(self):
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Query the homework history store')
+    parser.add_argument('--db', default=STORE_FILE, help='SQLite file to query')
+    parser.add_argument('--account', help='Only show this account')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    due = commands.add_parser('due', help='Unsubmitted homework due soon')
+    due.add_argument('--hours', type=float, default=48, help='Look-ahead window (default: 48)')
+    
+    changes = commands.add_parser('changes', help='Deadline changes for a course')
+    changes.add_argument('course', help='Course id (wlkcid) or name')
+    
+    args = parser.parse_args(argv)
+    
+    with HomeworkStore(args.db) as store:
+        if args.command == 'due':
+            rows = store.due_within(args.hours, account=args.account)
+            print(f"📅 {len(rows)} homework due in the next {args.hours:g}h")
+            for row in rows:
+                print(f"   {row['deadline']}  [{row['account']}] {row['course_name']} - {row['title']}")
+        else:
+            rows = store.deadline_changes(args.course, account=args.account)
+            print(f"🔁 {len(rows)} deadline changes for {args.course}")
+            for row in rows:
+                print(f"   {row['changed_at']}  [{row['account']}] {row['title']}: "
+                      f"{row['old_deadline']} → {row['new_deadline']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+HTTP transport tuning for the API session: connection pools sized to the
+crawl concurrency, keep-alive reuse, compressed responses, optional
+HTTP/2 through httpx, and counters that show how often connections
+were reused.
+"""
+import email.message
+import threading
+from types import SimpleNamespace
+from typing import Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+from .config import HTTP_POOL_SIZE, HTTP2_ENABLED
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with an explicit pool size that reports connection reuse."""
+    
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE):
+        # One host, so one pool; pool_maxsize is the number of sockets kept alive
+        super().__init__(pool_connections=4, pool_maxsize=pool_size, pool_block=False)
+        self.pool_size = pool_size
+    
+    def stats(self) -> dict:
+        """Requests sent, connections opened, and how many requests reused one."""
+        requests_sent = 0
+        connections = 0
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+        return _stats(requests_sent, connections)
+
+
+class _HttpxRaw:
+    """
+    Stands in for urllib3's response as ``requests.Response.raw``: streams
+    the (decoded) body of an httpx response, and exposes its headers the
+    way requests reads Set-Cookie from them.
+    """
+    
+    def __init__(self, httpx, result, request):
+        self._httpx = httpx
+        self._result = result
+        self._request = request
+        msg = email.message.Message()
+        for name, value in result.headers.multi_items():
+            msg[name] = value
+        # requests.cookies.extract_cookies_to_jar reads _original_response.msg
+        self._original_response = SimpleNamespace(msg=msg)
+    
+    def stream(self, amt: int = 65536, decode_content: bool = True):
+        try:
+            yield from self._result.iter_bytes(amt)
+        except self._httpx.TimeoutException as e:
+            raise requests.ConnectionError(str(e), request=self._request) from e
+        except self._httpx.TransportError as e:
+            raise requests.exceptions.ChunkedEncodingError(str(e), request=self._request) from e
+    
+    def close(self):
+        self._result.close()
+    
+    def release_conn(self):
+        self._result.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    Transport adapter that sends requests through ``httpx.Client``s with
+    HTTP/2 enabled (``pip install 'httpx[http2]'``), so concurrent requests
+    share multiplexed connections.
+    
+    ``stream``, ``verify``, ``cert`` and ``proxies`` are honoured: one
+    client is kept per TLS/proxy combination, streamed bodies are read
+    through ``response.raw``, and Set-Cookie reaches the session's jar.
+    """
+    
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE):
+        super().__init__()
+        import httpx
+        
+        self._httpx = httpx
+        self.pool_size = pool_size
+        self._clients = {}
+        self._requests_sent = 0
+        self._connections = set()
+        self._lock = threading.Lock()
+    
+    def _client(self, verify, cert, proxy: Optional[str]):
+        """The httpx client for one verify/cert/proxy combination."""
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                options = {'proxy': proxy} if proxy else {}
+                client = self._clients[key] = self._httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    cert=cert,
+                    limits=self._httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                    **options,
+                )
+            return client
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = self._httpx.Timeout(read, connect=connect)
+        
+        client = self._client(verify, cert, select_proxy(request.url, proxies or {}))
+        try:
+            result = client.send(
+                client.build_request(
+                    request.method,
+                    request.url,
+                    headers=dict(request.headers),
+                    content=request.body,
+                    timeout=timeout,
+                    extensions={'trace': self._trace},
+                ),
+                stream=True,
+            )
+        except self._httpx.TimeoutException as e:
+            raise requests.Timeout(str(e), request=request) from e
+        except self._httpx.TransportError as e:
+            raise requests.ConnectionError(str(e), request=request) from e
+        
+        with self._lock:
+            self._requests_sent += 1
+        
+        response = requests.Response()
+        response.status_code = result.status_code
+        response.headers = CaseInsensitiveDict(result.headers)
+        response.headers.pop('Content-Encoding', None)  # httpx decodes the body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _HttpxRaw(self._httpx, result, request)
+        response.reason = result.reason_phrase
+        response.url = str(result.url)
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content  # read the body and release the connection
+        return response
+    
+    def _trace(self, event_name: str, info: dict):
+        """httpcore trace hook: remember each distinct connection used."""
+        if event_name.endswith('connect_tcp.complete'):
+            with self._lock:
+                self._connections.add(id(info.get('return_value')))
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return _stats(self._requests_sent, len(self._connections))
+    
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+def _stats(requests_sent: int, connections: int) -> dict:
+    reused = max(requests_sent - connections, 0)
+    return {
+        'requests': requests_sent,
+        'connections': connections,
+        'reused': reused,
+        'reuse_ratio': reused / requests_sent if requests_sent else 0.0,
+    }
+
+
+def configure_transport(
+    session: requests.Session,
+    pool_size: int = HTTP_POOL_SIZE,
+    http2: bool = HTTP2_ENABLED,
+) -> requests.Session:
+    """
+    Mount a tuned transport on ``session``.
+    
+    Args:
+        session: Session to configure (modified in place)
+        pool_size: Connections kept alive; match it to the crawl concurrency
+        http2: Use the httpx-based HTTP/2 adapter (needs httpx[http2])
+    
+    Returns:
+        The same session, for chaining
+    """
+    if http2:
+        adapter = Http2Adapter(pool_size)
+    else:
+        adapter = CountingHTTPAdapter(pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+def transport_stats(session: requests.Session, url: str = 'https://') -> Optional[dict]:
+    """Connection reuse counters of the adapter serving ``url``, if it keeps any."""
+    adapter = session.get_adapter(url)
+    return adapter.stats() if hasattr(adapter, 'stats') else None
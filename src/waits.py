@@ -0,0 +1,80 @@
+"""
+Readiness-driven waits for the Selenium flow.
+Each wait polls a condition instead of sleeping a fixed time, reports how
+long it actually waited, and fails with a clear message on timeout.
+"""
+import time
+from typing import Callable, Iterable
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+POLL_INTERVAL = 0.1  # seconds between condition checks
+
+
+def wait_for(driver, condition: Callable, timeout: float, description: str) -> float:
+    """
+    Wait until ``condition(driver)`` is truthy.
+    
+    Args:
+        driver: Selenium WebDriver
+        condition: Callable taking the driver, as used by WebDriverWait
+        timeout: Maximum seconds to wait
+        description: What is being waited for (used in messages)
+    
+    Returns:
+        Seconds actually waited
+    
+    Raises:
+        TimeoutException: If the condition is not met within ``timeout``
+    """
+    start = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException as e:
+        raise TimeoutException(f"{description} not ready after {timeout}s") from e
+    
+    elapsed = time.monotonic() - start
+    print(f"   ⏱️ {description} ready after {elapsed:.2f}s")
+    return elapsed
+
+
+def document_complete(driver) -> bool:
+    """The current document has finished loading."""
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def element_present(css_selector: str) -> Callable:
+    """At least one element matches ``css_selector``."""
+    def condition(driver) -> bool:
+        return bool(driver.execute_script(
+            "return document.querySelector(arguments[0]) !== null", css_selector
+        ))
+    return condition
+
+
+def datatable_drawn(table_selector: str) -> Callable:
+    """
+    A DataTables table has finished drawing: its body has rows (an empty
+    table still renders one ``td.dataTables_empty`` row) and the
+    "processing" indicator is hidden.
+    """
+    def condition(driver) -> bool:
+        return bool(driver.execute_script("""
+            const table = document.querySelector(arguments[0]);
+            if (!table || !table.querySelector('tbody tr')) {
+                return false;
+            }
+            const processing = table.id && document.getElementById(table.id + '_processing');
+            return !processing || processing.offsetParent === null;
+        """, table_selector))
+    return condition
+
+
+def cookies_present(names: Iterable[str]) -> Callable:
+    """All cookies in ``names`` have been set for the current domain."""
+    names = set(names)
+    
+    def condition(driver) -> bool:
+        return names <= {c['name'] for c in driver.get_cookies()}
+    return condition
@@ -0,0 +1,108 @@
+"""
+Watch mode: keep one authenticated HomeworkCrawler alive and poll it at an
+interval that follows the nearest deadline. Reports are regenerated only
+when something visible changed.
+"""
+import hashlib
+import time
+from typing import Callable, List, Optional
+
+from .auth import WebLearningAuth
+from .config import WATCH_INTERVALS, WATCH_INTERVAL_DEFAULT, WATCH_RETRY_INTERVAL
+from .crawler import HomeworkCrawler
+from .models import Clock, Homework
+
+
+def next_interval(homework_list: List[Homework], clock: Clock) -> int:
+    """Seconds until the next poll, based on the most urgent open homework."""
+    levels = [
+        hw.urgency_at(clock)
+        for hw in homework_list
+        if not hw.is_done and not hw.expired_at(clock)
+    ]
+    return WATCH_INTERVALS.get(min(levels, default=None), WATCH_INTERVAL_DEFAULT)
+
+
+def homework_fingerprint(homework_list: List[Homework], clock: Clock) -> str:
+    """
+    Hash of everything the reports show. Urgency levels and the time
+    left ("5天", "4天", ...) are included so the report is also refreshed
+    as deadlines approach, not only when the data changes.
+    """
+    digest = hashlib.sha1()
+    for hw in sorted(homework_list, key=lambda h: (h.course_id, h.id)):
+        digest.update(
+            f"{hw.course_id}|{hw.id}|{hw.title}|{hw.deadline_str}|{hw.status}|"
+            f"{hw.urgency_at(clock)}|{hw.time_left_at(clock)}\n".encode('utf-8')
+        )
+    return digest.hexdigest()
+
+
+def watch(
+    crawler: HomeworkCrawler,
+    on_change: Callable[[List[Homework]], None],
+    semester_id: Optional[str] = None,
+    max_polls: Optional[int] = None,
+    on_poll: Optional[Callable[[Optional[List[Homework]]], None]] = None,
+    auth: Optional[WebLearningAuth] = None,
+):
+    """
+    Poll for homework until interrupted.
+    
+    Args:
+        crawler: HomeworkCrawler with an authenticated session
+        on_change: Called with the homework list whenever it changed
+        semester_id: Semester to watch (None = current)
+        max_polls: Stop after this many polls (None = run forever)
+        on_poll: Called after every poll with its homework list, or None
+                 if the poll failed (e.g. to export metrics)
+        auth: Used to log in again when a failed poll turns out to be an
+              expired session (None: keep retrying with the old session)
+    
+    Raises:
+        RuntimeError: If logging in again fails
+    """
+    last_fingerprint = None
+    polls = 0
+    
+    while max_polls is None or polls < max_polls:
+        polls += 1
+        print(f"\n🔄 [{time.strftime('%H:%M:%S')}] Checking homework...")
+        
+        try:
+            homework_list = crawler.get_all_homework(semester_id)
+        except Exception as e:
+            print(f"⚠️ Poll failed: {e}")
+            homework_list = None
+            interval = WATCH_RETRY_INTERVAL
+        else:
+            clock = Clock()
+            fingerprint = homework_fingerprint(homework_list, clock)
+            if crawler.failures:
+                # Partial data would look like homework disappeared
+                print("   Some lists failed, keeping the previous reports")
+                interval = WATCH_RETRY_INTERVAL
+            elif fingerprint != last_fingerprint:
+                on_change(homework_list)
+                last_fingerprint = fingerprint
+                interval = next_interval(homework_list, clock)
+            else:
+                print("   No changes, reports left as they are")
+                interval = next_interval(homework_list, clock)
+        
+        if on_poll:
+            on_poll(homework_list)
+        
+        # An open circuit means the server is down, not that we were logged out
+        failed = homework_list is None or bool(crawler.failures)
+        if (failed and auth is not None and not crawler.policy.breaker.is_open
+                and not auth.session_valid(crawler.session)):
+            print("🔐 Session expired, logging in again...")
+            crawler.session = auth.login()
+            interval = 0  # poll again right away with the new session
+        
+        if max_polls is not None and polls >= max_polls:
+            break
+        if interval:
+            print(f"💤 Next check in {interval // 60} min")
+            time.sleep(interval)
@@ -0,0 +1,7 @@
+"""Make ``src`` and ``benchmarks`` importable when running pytest from anywhere."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,60 @@
+"""ResponseCache TTL and least-recently-used eviction."""
+import os
+
+import src.cache
+from src.cache import ResponseCache
+
+URL = "https://example.test/b/semesters"
+
+
+class _FakeTime:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+    
+    def time(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = _FakeTime()
+    monkeypatch.setattr(src.cache, "time", clock)
+    cache = ResponseCache(str(tmp_path), ttls={URL: 60})
+    
+    cache.set(URL, {"a": 1}, {"ok": True})
+    assert cache.get(URL, {"a": 1}) == {"ok": True}
+    assert cache.get(URL, {"a": 2}) is None  # other parameters, other entry
+    
+    clock.now += 60
+    assert cache.get(URL, {"a": 1}) == {"ok": True}
+    clock.now += 1
+    assert cache.get(URL, {"a": 1}) is None
+
+
+def test_endpoints_without_ttl_are_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={URL: 60})
+    cache.set("https://example.test/b/homework", None, {"ok": True})
+    assert cache.get("https://example.test/b/homework") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={URL: 3600}, max_entries=2)
+    cache.set(URL, {"n": 1}, {"n": 1})
+    cache.set(URL, {"n": 2}, {"n": 2})
+    # Make entry 1 the most recently used one, entry 2 the oldest
+    os.utime(cache._path(URL, {"n": 2}), (1, 1))
+    os.utime(cache._path(URL, {"n": 1}), (2, 2))
+    
+    cache.set(URL, {"n": 3}, {"n": 3})
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.get(URL, {"n": 2}) is None
+    assert cache.get(URL, {"n": 1}) == {"n": 1}
+    assert cache.get(URL, {"n": 3}) == {"n": 3}
+
+
+def test_clear_removes_everything(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={URL: 3600})
+    cache.set(URL, None, {"ok": True})
+    cache.clear()
+    assert cache.get(URL) is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,80 @@
+"""parse_deadline and Clock-based urgency / time left."""
+from datetime import datetime, timedelta
+
+from src.deadline import format_deadline, parse_deadline
+from src.models import Clock, Homework
+
+
+def _homework(deadline=None, time_left=""):
+    return Homework(
+        id="hw1", title="Lab 1", course_name="Course", course_id="c1",
+        deadline=deadline, time_left=time_left,
+    )
+
+
+def test_parse_deadline_known_shapes():
+    assert parse_deadline("2024-12-31") == datetime(2024, 12, 31)
+    assert parse_deadline("2024-12-31 23:59") == datetime(2024, 12, 31, 23, 59)
+    assert parse_deadline("2024-12-31 23:59:30") == datetime(2024, 12, 31, 23, 59, 30)
+    assert parse_deadline("  2024-12-31 23:59  ") == datetime(2024, 12, 31, 23, 59)
+
+
+def test_parse_deadline_epoch_milliseconds():
+    expected = datetime(2024, 12, 31, 23, 59)
+    ms = int(expected.timestamp() * 1000)
+    assert parse_deadline(ms) == expected
+    assert parse_deadline(float(ms)) == expected
+    assert parse_deadline(str(ms)) == expected
+
+
+def test_parse_deadline_fallback_formats():
+    # Single-digit fields miss the fast path but strptime accepts them
+    assert parse_deadline("2024-1-5 8:05") == datetime(2024, 1, 5, 8, 5)
+
+
+def test_parse_deadline_rejects_garbage():
+    for value in (None, True, "", "   ", "tomorrow", "2024-13-01", "2024-02-30 10:00", [], {}):
+        assert parse_deadline(value) is None
+
+
+def test_format_deadline():
+    assert format_deadline(datetime(2024, 3, 1, 9, 5, 30)) == "2024-03-01 09:05"
+    assert format_deadline(None) == ""
+
+
+def test_clock_captures_one_instant():
+    now = datetime(2024, 5, 1, 12, 0)
+    clock = Clock(now)
+    assert clock.now == now
+    assert clock.timestamp == now.timestamp()
+
+
+def test_urgency_and_time_left_follow_the_clock():
+    now = datetime(2024, 5, 1, 12, 0)
+    clock = Clock(now)
+    cases = [
+        (now - timedelta(minutes=1), 0, "已过期"),
+        (now + timedelta(hours=5, minutes=30), 1, "5小时"),
+        (now + timedelta(hours=50), 2, "2天"),
+        (now + timedelta(days=5), 3, "5天"),
+        (now + timedelta(days=30), 4, "30天"),
+    ]
+    for deadline, urgency, time_left in cases:
+        hw = _homework(deadline)
+        assert hw.urgency_at(clock) == urgency
+        assert hw.time_left_at(clock) == time_left
+        assert hw.expired_at(clock) == (urgency == 0)
+
+
+def test_no_deadline_sorts_last_and_keeps_scraped_time_left():
+    clock = Clock(datetime(2024, 5, 1, 12, 0))
+    undated = _homework(time_left="未设置")
+    assert undated.urgency_at(clock) == 5
+    assert undated.time_left_at(clock) == "未设置"
+    assert not undated.expired_at(clock)
+    
+    soon = _homework(clock.now + timedelta(hours=1))
+    late = _homework(clock.now + timedelta(days=9))
+    expired = _homework(clock.now - timedelta(days=1))
+    ordered = sorted([undated, expired, late, soon], key=lambda hw: hw.sort_key(clock))
+    assert ordered == [soon, late, expired, undated]
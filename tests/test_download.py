@@ -0,0 +1,104 @@
+"""Downloader resume, If-Range and deduplication against the mock server."""
+import hashlib
+import os
+
+import requests
+
+from benchmarks.mock_server import MockWlxtServer
+from src.download import DownloadJob, Downloader
+from src.metrics import Metrics
+from src.policy import CircuitBreaker, RequestPolicy
+
+FILE_SIZE = 64 * 1024
+
+
+def _url(server, key):
+    return f"{server.base_url}/b/wlxt/kj/wlkc_kjxxb/student/downloadFile?wjid={key}"
+
+
+def _downloader(root, chunk_size=4096):
+    policy = RequestPolicy(
+        max_retries=0, backoff_base=0, breaker=CircuitBreaker(100, 60), metrics=Metrics()
+    )
+    return Downloader(requests.Session(), root=str(root), workers=2, policy=policy,
+                      chunk_size=chunk_size)
+
+
+def _part_path(downloader, url):
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part'
+    return os.path.join(downloader.objects_dir, name)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_broken_transfer_is_resumed(tmp_path):
+    with MockWlxtServer(latency=0, file_size=FILE_SIZE) as server:
+        drops = iter([True])
+        server.should_drop = lambda: next(drops, False)
+        url = _url(server, "slides")
+        
+        report = _downloader(tmp_path).download([DownloadJob(url, "OS/课件/slides.pdf")])
+        
+        assert report.failed == []
+        assert report.downloaded == 1
+        # Half the file, then the other half through a Range request
+        assert report.bytes == FILE_SIZE
+        assert _read(tmp_path / "OS" / "课件" / "slides.pdf") == server.file_content("slides")
+
+
+def test_part_file_from_an_earlier_run_is_resumed(tmp_path):
+    with MockWlxtServer(latency=0, file_size=FILE_SIZE) as server:
+        url = _url(server, "notes")
+        content = server.file_content("notes")
+        downloader = _downloader(tmp_path)
+        os.makedirs(downloader.objects_dir)
+        part_path = _part_path(downloader, url)
+        with open(part_path, 'wb') as f:
+            f.write(content[:1000])
+        with open(f"{part_path}.validator", 'w', encoding='utf-8') as f:
+            f.write(f'"{hashlib.sha1(content).hexdigest()}"')
+        
+        report = downloader.download([DownloadJob(url, "OS/课件/notes.pdf")])
+        
+        assert report.bytes == FILE_SIZE - 1000
+        assert _read(tmp_path / "OS" / "课件" / "notes.pdf") == content
+        assert not os.path.exists(part_path)
+
+
+def test_stale_part_file_is_downloaded_again(tmp_path):
+    with MockWlxtServer(latency=0, file_size=FILE_SIZE) as server:
+        url = _url(server, "notes")
+        downloader = _downloader(tmp_path)
+        os.makedirs(downloader.objects_dir)
+        part_path = _part_path(downloader, url)
+        with open(part_path, 'wb') as f:
+            f.write(b"x" * 1000)  # from an older version of the file
+        with open(f"{part_path}.validator", 'w', encoding='utf-8') as f:
+            f.write('"old-version"')
+        
+        report = downloader.download([DownloadJob(url, "OS/课件/notes.pdf")])
+        
+        # If-Range did not match, so the server sent the whole file
+        assert report.bytes == FILE_SIZE
+        assert _read(tmp_path / "OS" / "课件" / "notes.pdf") == server.file_content("notes")
+
+
+def test_identical_files_are_stored_once_and_not_fetched_again(tmp_path):
+    with MockWlxtServer(latency=0, file_size=FILE_SIZE) as server:
+        jobs = [
+            DownloadJob(_url(server, "shared"), "OS/课件/须知.pdf"),
+            DownloadJob(_url(server, "shared"), "DB/课件/须知.pdf"),
+        ]
+        report = _downloader(tmp_path).download(jobs)
+        assert report.downloaded == 1
+        assert os.path.samefile(tmp_path / "OS" / "课件" / "须知.pdf",
+                                tmp_path / "DB" / "课件" / "须知.pdf")
+        
+        server.reset_counts()
+        report = _downloader(tmp_path).download(jobs)
+        assert report.reused == 1
+        assert report.bytes == 0
+        assert server.counts.get('downloadFile', 0) == 0
@@ -0,0 +1,137 @@
+"""RequestPolicy retries and CircuitBreaker state transitions."""
+import pytest
+import requests
+
+import src.policy
+from src.metrics import Metrics
+from src.policy import CircuitBreaker, CircuitOpenError, RequestPolicy
+
+URL = "https://example.test/b/list"
+
+
+def _response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.url = URL
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+
+class _FakeSession:
+    """Answers each request with the next outcome (a status code or an exception)."""
+    
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+    
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _response(outcome)
+
+
+class _FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+def _policy(breaker=None, max_retries=3):
+    return RequestPolicy(
+        max_retries=max_retries, backoff_base=0, breaker=breaker or CircuitBreaker(100, 60),
+        metrics=Metrics(),
+    )
+
+
+def test_retries_transient_errors_until_success():
+    session = _FakeSession(503, requests.ConnectionError("reset"), 200)
+    policy = _policy()
+    assert policy.request(session, "POST", URL).status_code == 200
+    assert session.calls == 3
+    assert not policy.breaker.is_open
+
+
+def test_gives_up_after_max_retries():
+    session = _FakeSession(500, 502, 504)
+    with pytest.raises(requests.HTTPError):
+        _policy(max_retries=2).request(session, "POST", URL)
+    assert session.calls == 3
+
+
+def test_non_idempotent_requests_are_sent_once():
+    session = _FakeSession(503, 200)
+    with pytest.raises(requests.HTTPError):
+        _policy().request(session, "POST", URL, idempotent=False)
+    assert session.calls == 1
+
+
+def test_client_errors_are_not_retried_and_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    session = _FakeSession(404)
+    with pytest.raises(requests.HTTPError):
+        _policy(breaker).request(session, "POST", URL)
+    assert session.calls == 1
+    assert not breaker.is_open
+
+
+def test_retry_after_is_honoured_up_to_backoff_max():
+    policy = RequestPolicy(backoff_base=0, backoff_max=5, metrics=Metrics())
+    assert policy._backoff(0, _response(429, {"Retry-After": "2"})) == 2
+    assert policy._backoff(0, _response(429, {"Retry-After": "120"})) == 5
+    assert policy._backoff(3, None) == 0
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    clock = _FakeMonotonic()
+    monkeypatch.setattr(src.policy, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    
+    breaker.before_call()
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    # After the timeout exactly one trial call is let through
+    clock.now += 30
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_call()
+
+
+def test_failed_trial_call_reopens_the_breaker(monkeypatch):
+    clock = _FakeMonotonic()
+    monkeypatch.setattr(src.policy, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.is_open
+    # The timeout starts over from the failed trial
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 1
+    breaker.before_call()
+
+
+def test_open_breaker_stops_requests_before_they_are_sent():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    session = _FakeSession(503, 503, 200)
+    with pytest.raises(CircuitOpenError):
+        _policy(breaker).request(session, "POST", URL)
+    assert session.calls == 2
+    assert breaker.is_open
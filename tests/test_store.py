@@ -0,0 +1,77 @@
+"""HomeworkStore upserts and deadline change history."""
+from datetime import datetime
+
+from src.models import Course, Homework
+from src.store import HomeworkStore
+
+COURSE = Course(id="c1", name="Operating Systems", teacher="T")
+
+
+def _homework(hw_id, deadline, title="Lab", status="unsubmitted"):
+    return Homework(
+        id=hw_id, title=title, course_name=COURSE.name, course_id=COURSE.id,
+        deadline=deadline, status=status,
+    )
+
+
+def test_record_crawl_upserts_and_logs_deadline_changes(tmp_path):
+    first = datetime(2024, 5, 1, 8, 0)
+    second = datetime(2024, 5, 2, 8, 0)
+    with HomeworkStore(str(tmp_path / "history.db")) as store:
+        changes = store.record_crawl(
+            [_homework("h1", datetime(2024, 5, 10, 23, 59)),
+             _homework("h2", datetime(2024, 5, 12, 23, 59))],
+            [COURSE], account="alice", crawled_at=first,
+        )
+        assert changes == 0
+        
+        changes = store.record_crawl(
+            [_homework("h1", datetime(2024, 5, 11, 23, 59), title="Lab (extended)", status="submitted"),
+             _homework("h2", datetime(2024, 5, 12, 23, 59))],
+            [COURSE], account="alice", crawled_at=second,
+        )
+        assert changes == 1
+        
+        rows = {row["id"]: row for row in store.conn.execute("SELECT * FROM homework")}
+        assert len(rows) == 2
+        assert rows["h1"]["title"] == "Lab (extended)"
+        assert rows["h1"]["status"] == "submitted"
+        assert rows["h1"]["deadline"] == "2024-05-11T23:59:00"
+        assert rows["h1"]["first_seen"] == "2024-05-01T08:00:00"
+        assert rows["h1"]["last_seen"] == "2024-05-02T08:00:00"
+        
+        assert store.conn.execute("SELECT COUNT(*) FROM courses").fetchone()[0] == 1
+        assert store.conn.execute("SELECT COUNT(*) FROM crawls").fetchone()[0] == 2
+        
+        by_name = store.deadline_changes(COURSE.name)
+        by_id = store.deadline_changes(COURSE.id)
+        assert [tuple(row) for row in by_name] == [tuple(row) for row in by_id]
+        (change,) = by_name
+        assert change["homework_id"] == "h1"
+        assert change["old_deadline"] == "2024-05-10T23:59:00"
+        assert change["new_deadline"] == "2024-05-11T23:59:00"
+        assert change["changed_at"] == "2024-05-02T08:00:00"
+
+
+def test_accounts_are_kept_apart(tmp_path):
+    with HomeworkStore(str(tmp_path / "history.db")) as store:
+        store.record_crawl([_homework("h1", datetime(2024, 5, 10))], account="alice")
+        # Same id for another account: no change is logged for alice
+        assert store.record_crawl([_homework("h1", datetime(2024, 6, 1))], account="bob") == 0
+        assert store.record_crawl([_homework("h1", datetime(2024, 5, 20))], account="alice") == 1
+        
+        assert len(store.deadline_changes(COURSE.id, account="alice")) == 1
+        assert store.deadline_changes(COURSE.id, account="bob") == []
+        assert store.conn.execute("SELECT COUNT(*) FROM homework").fetchone()[0] == 2
+
+
+def test_due_within_lists_unsubmitted_homework_only(tmp_path):
+    now = datetime(2024, 5, 1, 12, 0)
+    with HomeworkStore(str(tmp_path / "history.db")) as store:
+        store.record_crawl([
+            _homework("soon", datetime(2024, 5, 2, 10, 0)),
+            _homework("done", datetime(2024, 5, 2, 10, 0), status="submitted"),
+            _homework("later", datetime(2024, 5, 9, 10, 0)),
+            _homework("past", datetime(2024, 4, 30, 10, 0)),
+        ], account="alice")
+        assert [row["id"] for row in store.due_within(48, now=now)] == ["soon"]